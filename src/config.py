@@ -29,6 +29,9 @@ class IndexingConfig:
     max_concurrent_functions: int = 5  # Parallel function analysis per file
     max_concurrent_ast_parsing: int = 10
     max_concurrent_llm_batches: int = 5  # For Pass 2 enrichment in EnhancedIndexer
+    embedding_batch_size: int = 64  # Texts per embedding request (Index 3)
+    llm_analysis_min_lines: int = 8  # Shorter small functions skip the LLM (Index 3)
+    chroma_batch_size: int = 100  # Chunks per ChromaDB write while indexing (legacy index)
     rate_limit_rpm: int = 3500  # Requests per minute
     rate_limit_tpm: int = 1000000  # Tokens per minute
 
@@ -137,6 +140,9 @@ def load_config(config_path: Optional[Path] = None) -> Config:
         max_concurrent_functions=int(os.getenv("MAX_CONCURRENT_FUNCTIONS", "5")),
         max_concurrent_ast_parsing=int(os.getenv("MAX_CONCURRENT_AST_PARSING", "10")),
         max_concurrent_llm_batches=int(os.getenv("MAX_CONCURRENT_LLM_BATCHES", "5")),
+        embedding_batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+        llm_analysis_min_lines=int(os.getenv("LLM_ANALYSIS_MIN_LINES", "8")),
+        chroma_batch_size=int(os.getenv("CHROMA_BATCH_SIZE", "100")),
         rate_limit_rpm=int(os.getenv("RATE_LIMIT_RPM", "3500")),
         rate_limit_tpm=int(os.getenv("RATE_LIMIT_TPM", "1000000")),
     )
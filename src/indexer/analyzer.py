@@ -1,12 +1,15 @@
 """Code analysis using LLM with project context."""
 
+import asyncio
 import json
 from pathlib import Path
 from typing import Optional
 
 from ..providers.base import LLMProvider, ChatMessage
 from ..storage.models import CodeAnalysis, FunctionInfo, ProjectContext
+from ..storage.response_cache import ResponseCache
 from ..utils.logger import get_logger
+from ..utils.rate_limiter import RateLimiter
 
 logger = get_logger(__name__)
 
@@ -17,7 +20,9 @@ async def analyze_code(
     language: str,
     file_type: str,
     project_context: Optional[ProjectContext],
-    llm_provider: LLMProvider
+    llm_provider: LLMProvider,
+    response_cache: Optional[ResponseCache] = None,
+    rate_limiter: Optional[RateLimiter] = None
 ) -> CodeAnalysis:
     """
     Analyze code file using LLM with project context.
@@ -29,6 +34,9 @@ async def analyze_code(
         file_type: File type (code|documentation|config|test).
         project_context: Project context for better analysis.
         llm_provider: LLM provider for analysis.
+        response_cache: Optional cache of LLM responses by exact prompt.
+        rate_limiter: Optional rate limiter acquired before each LLM request
+            (cache hits don't acquire).
 
     Returns:
         CodeAnalysis object.
@@ -74,28 +82,47 @@ async def analyze_code(
         }
     }
 
-    try:
-        response = await llm_provider.chat_completion(
-            messages=[
-                ChatMessage(
-                    role="system",
-                    content="You are a code analysis expert. Analyze code and provide structured JSON output."
-                ),
-                ChatMessage(
-                    role="user",
-                    content=prompt
-                )
-            ],
-            response_format={"type": "json_schema", "json_schema": schema}
+    messages = [
+        ChatMessage(
+            role="system",
+            content="You are a code analysis expert. Analyze code and provide structured JSON output."
+        ),
+        ChatMessage(
+            role="user",
+            content=prompt
         )
+    ]
+
+    cache_key = None
+    content = None
+    if response_cache is not None:
+        cache_key = ResponseCache.make_key(llm_provider.model_name, [m.content for m in messages])
+        # SQLite lookups and writes stay off the event loop
+        content = await asyncio.to_thread(response_cache.get, cache_key)
+
+    try:
+        fetched = content is None
+        if fetched:
+            if rate_limiter is not None:
+                await rate_limiter.acquire(tokens=1000, request_count=1)
+
+            response = await llm_provider.chat_completion(
+                messages=messages,
+                response_format={"type": "json_schema", "json_schema": schema}
+            )
+            content = response.content
 
         # Parse response
-        result = json.loads(response.content)
+        result = json.loads(content)
 
         # Validate that result is a dict
         if not isinstance(result, dict):
             raise ValueError(f"Expected dict, got {type(result).__name__}: {result}")
 
+        # Only cache responses with the expected shape
+        if cache_key is not None and fetched:
+            await asyncio.to_thread(response_cache.put, cache_key, content)
+
         # Parse functions with safe access
         functions = []
         key_functions = result.get("key_functions", [])
@@ -120,7 +147,7 @@ async def analyze_code(
         return analysis
 
     except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse JSON from {file_path}: {e}. Response: {response.content[:200]}")
+        logger.error(f"Failed to parse JSON from {file_path}: {e}. Response: {content[:200]}")
     except Exception as e:
         logger.error(f"Failed to analyze {file_path}: {e}")
         # Return minimal analysis
@@ -146,9 +173,9 @@ def _build_code_analysis_prompt(
         context_section = f"""PROJECT CONTEXT:
 - Project: {project_context.project_name}
 - Description: {project_context.project_description}
-- Tech Stack: {', '.join(project_context.tech_stack)}
+- Tech Stack: {project_context.tech_stack_text}
 - Architecture: {project_context.architecture_type}
-- Frameworks: {', '.join(project_context.frameworks)}
+- Frameworks: {project_context.frameworks_text}
 """
 
     prompt = f"""{context_section}
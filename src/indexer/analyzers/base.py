@@ -105,7 +105,13 @@ class BaseLanguageAnalyzer(ABC):
         return params
 
     @abstractmethod
-    def extract_functions(self, tree, code: str, file_path: Path) -> List[ExtractedFunction]:
+    def extract_functions(
+        self,
+        tree,
+        code: str,
+        file_path: Path,
+        code_bytes: Optional[bytes] = None
+    ) -> List[ExtractedFunction]:
         """
         Extract all functions with their complete code (for Index 3).
 
@@ -116,6 +122,8 @@ class BaseLanguageAnalyzer(ABC):
             tree: Tree-sitter AST tree
             code: Source code string
             file_path: Path to source file
+            code_bytes: UTF-8 bytes of code if the caller already has them
+                (e.g. the bytes that were parsed); encoded from code otherwise
 
         Returns:
             List of ExtractedFunction objects with complete function details
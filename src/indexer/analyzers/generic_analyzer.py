@@ -80,6 +80,8 @@ class GenericAnalyzer(BaseLanguageAnalyzer):
                         parameters=params,
                         return_type=None,
                         line_number=node.start_point[0] + 1,
+                        start_byte=node.start_byte,
+                        end_byte=node.end_byte,
                         is_async=False,
                         is_method=parent_function is not None
                     ))
@@ -122,7 +124,13 @@ class GenericAnalyzer(BaseLanguageAnalyzer):
 
         return CallGraph(functions=functions, calls=calls, imports=imports, exports=exports)
 
-    def extract_functions(self, tree, code: str, file_path: Path) -> List[ExtractedFunction]:
+    def extract_functions(
+        self,
+        tree,
+        code: str,
+        file_path: Path,
+        code_bytes: Optional[bytes] = None
+    ) -> List[ExtractedFunction]:
         """
         Extract all functions from code with full details.
 
@@ -132,13 +140,15 @@ class GenericAnalyzer(BaseLanguageAnalyzer):
             tree: Tree-sitter AST tree
             code: Source code
             file_path: Path to source file
+            code_bytes: UTF-8 bytes of code, if already available
 
         Returns:
             List of ExtractedFunction objects
         """
         functions = []
         root_node = tree.root_node
-        code_bytes = bytes(code, "utf8")
+        if code_bytes is None:
+            code_bytes = code.encode("utf-8")
         code_lines = code.split('\n')
 
         def get_function_code(start_line: int, end_line: int) -> str:
@@ -102,6 +102,8 @@ class KotlinAnalyzer(BaseLanguageAnalyzer):
                         parameters=params,
                         return_type=return_type,
                         line_number=node.start_point[0] + 1,
+                        start_byte=node.start_byte,
+                        end_byte=node.end_byte,
                         is_async=is_async,
                         is_method=parent_class is not None,
                         class_name=current_class
@@ -249,16 +251,16 @@ class KotlinAnalyzer(BaseLanguageAnalyzer):
             # Handle wildcard imports
             if import_path.endswith('.*'):
                 module = import_path[:-2]
-                return ImportStatement(module=module, imported_names=[], alias=None)
+                return ImportStatement(module=module, imported_names=frozenset(), alias=None)
 
             # Regular import
             parts = import_path.split('.')
             if len(parts) > 1:
                 module = '.'.join(parts[:-1])
                 name = parts[-1]
-                return ImportStatement(module=module, imported_names=[name], alias=None)
+                return ImportStatement(module=module, imported_names=frozenset((name,)), alias=None)
             else:
-                return ImportStatement(module=import_path, imported_names=[], alias=None)
+                return ImportStatement(module=import_path, imported_names=frozenset(), alias=None)
 
         return None
 
@@ -280,7 +282,13 @@ class KotlinAnalyzer(BaseLanguageAnalyzer):
                 return self.get_text(child, code_bytes)
         return None
 
-    def extract_functions(self, tree, code: str, file_path: Path) -> List[ExtractedFunction]:
+    def extract_functions(
+        self,
+        tree,
+        code: str,
+        file_path: Path,
+        code_bytes: Optional[bytes] = None
+    ) -> List[ExtractedFunction]:
         """
         Extract all functions from Kotlin code with full details.
 
@@ -295,13 +303,15 @@ class KotlinAnalyzer(BaseLanguageAnalyzer):
             tree: Tree-sitter AST tree
             code: Kotlin source code
             file_path: Path to Kotlin file
+            code_bytes: UTF-8 bytes of code, if already available
 
         Returns:
             List of ExtractedFunction objects
         """
         functions = []
         root_node = tree.root_node
-        code_bytes = bytes(code, "utf8")
+        if code_bytes is None:
+            code_bytes = code.encode("utf-8")
         code_lines = code.split('\n')
 
         def get_function_code(start_line: int, end_line: int) -> str:
@@ -96,6 +96,8 @@ class PythonAnalyzer(BaseLanguageAnalyzer):
                         parameters=params,
                         return_type=None,
                         line_number=node.start_point[0] + 1,
+                        start_byte=node.start_byte,
+                        end_byte=node.end_byte,
                         is_async=is_async,
                         is_method=current_class is not None,
                         class_name=current_class
@@ -201,7 +203,7 @@ class PythonAnalyzer(BaseLanguageAnalyzer):
                         alias = self.get_text(alias_node, code_bytes)
 
             if module_name:
-                return ImportStatement(module=module_name, imported_names=[], alias=alias)
+                return ImportStatement(module=module_name, imported_names=frozenset(), alias=alias)
 
         elif node.type == 'import_from_statement':
             # from X import Y
@@ -219,11 +221,17 @@ class PythonAnalyzer(BaseLanguageAnalyzer):
                     imported_names.append(self.get_text(child, code_bytes))
 
             if module_name:
-                return ImportStatement(module=module_name, imported_names=imported_names, alias=None)
+                return ImportStatement(module=module_name, imported_names=frozenset(imported_names), alias=None)
 
         return None
 
-    def extract_functions(self, tree, code: str, file_path: Path) -> List[ExtractedFunction]:
+    def extract_functions(
+        self,
+        tree,
+        code: str,
+        file_path: Path,
+        code_bytes: Optional[bytes] = None
+    ) -> List[ExtractedFunction]:
         """
         Extract all functions from Python code with full details.
 
@@ -238,13 +246,15 @@ class PythonAnalyzer(BaseLanguageAnalyzer):
             tree: Tree-sitter AST tree
             code: Python source code
             file_path: Path to Python file
+            code_bytes: UTF-8 bytes of code, if already available
 
         Returns:
             List of ExtractedFunction objects
         """
         functions = []
         root_node = tree.root_node
-        code_bytes = bytes(code, "utf8")
+        if code_bytes is None:
+            code_bytes = code.encode("utf-8")
         code_lines = code.split('\n')
 
         def get_function_code(start_line: int, end_line: int) -> str:
@@ -4,14 +4,54 @@ This module provides language-agnostic code analysis by using tree-sitter parser
 Tree-sitter supports 50+ languages with a unified API.
 """
 
+import threading
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Set
+from dataclasses import dataclass, field
+from functools import lru_cache
 
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Languages we support
+SUPPORTED_LANGUAGES = [
+    'python', 'javascript', 'typescript', 'go', 'rust',
+    'java', 'kotlin', 'c', 'cpp', 'c_sharp', 'ruby', 'php',
+    'swift', 'scala'
+]
+
+
+@lru_cache(maxsize=None)
+def _load_language(lang_key: str):
+    """
+    Load a tree-sitter grammar once per process.
+
+    Every ASTAnalyzer and every worker thread shares the loaded Language;
+    only the (cheap, non-thread-safe) Parser objects are per thread.
+
+    Args:
+        lang_key: Normalized language name
+
+    Returns:
+        tree-sitter Language or None if the grammar can't be loaded
+    """
+    try:
+        from tree_sitter_languages import get_language
+        return get_language(lang_key)
+    except Exception as e:
+        logger.warning(f"Could not load parser for {lang_key}: {e}")
+        return None
+
+
+def _new_parser(language):
+    """Create a Parser bound to an already loaded Language."""
+    from tree_sitter import Parser
+    parser = Parser()
+    parser.set_language(language)
+    return parser
+
 
 @dataclass
 class FunctionCall:
@@ -33,13 +73,15 @@ class FunctionDefinition:
     is_async: bool = False
     is_method: bool = False
     class_name: Optional[str] = None
+    start_byte: int = 0  # UTF-8 byte span of the definition in the source
+    end_byte: int = 0
 
 
 @dataclass
 class ImportStatement:
     """Represents an import."""
     module: str
-    imported_names: List[str]  # Empty if import *
+    imported_names: FrozenSet[str]  # Empty if import *; frozenset for O(1) membership
     alias: Optional[str] = None
 
 
@@ -51,13 +93,36 @@ class CallGraph:
     imports: List[ImportStatement]
     exports: List[str]  # Exported symbols
 
+    # Lookup indexes built on first query, so repeated lookups are O(1)
+    # instead of a scan over every call
+    _callers_by_callee: Optional[Dict[str, List[str]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _callees_by_caller: Optional[Dict[str, List[str]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def _build_call_indexes(self):
+        """Partition calls by callee and by caller in a single pass."""
+        callers_by_callee = defaultdict(list)
+        callees_by_caller = defaultdict(list)
+        for call in self.calls:
+            callers_by_callee[call.callee_name].append(call.caller_function)
+            callees_by_caller[call.caller_function].append(call.callee_name)
+        self._callers_by_callee = dict(callers_by_callee)
+        self._callees_by_caller = dict(callees_by_caller)
+
     def get_callers(self, function_name: str) -> List[str]:
         """Get all functions that call this function."""
-        return [call.caller_function for call in self.calls if call.callee_name == function_name]
+        if self._callers_by_callee is None:
+            self._build_call_indexes()
+        return list(self._callers_by_callee.get(function_name, ()))
 
     def get_callees(self, function_name: str) -> List[str]:
         """Get all functions called by this function."""
-        return [call.callee_name for call in self.calls if call.caller_function == function_name]
+        if self._callees_by_caller is None:
+            self._build_call_indexes()
+        return list(self._callees_by_caller.get(function_name, ()))
 
 
 class ASTAnalyzer:
@@ -72,6 +137,8 @@ class ASTAnalyzer:
         """Initialize tree-sitter parsers for supported languages."""
         self.parsers = {}
         self.language_configs = {}
+        # tree-sitter parsers are not thread-safe: each thread gets its own
+        self._local = threading.local()
 
         # Try to load tree-sitter (optional dependency)
         try:
@@ -88,24 +155,65 @@ class ASTAnalyzer:
     def _init_parsers(self):
         """Initialize tree-sitter parsers for each language."""
         try:
-            from tree_sitter_languages import get_language, get_parser
-
-            # Languages we support
-            languages = [
-                'python', 'javascript', 'typescript', 'go', 'rust',
-                'java', 'kotlin', 'c', 'cpp', 'c_sharp', 'ruby', 'php',
-                'swift', 'scala'
-            ]
-
-            for lang in languages:
-                try:
-                    self.parsers[lang] = get_parser(lang)
-                    logger.debug(f"Loaded tree-sitter parser for {lang}")
-                except Exception as e:
-                    logger.warning(f"Could not load parser for {lang}: {e}")
-
+            import tree_sitter_languages  # noqa: F401
         except ImportError:
             logger.warning("tree-sitter-languages not installed. Install: pip install tree-sitter-languages")
+            return
+
+        self.preload_languages(SUPPORTED_LANGUAGES)
+
+    def preload_languages(self, languages: List[str]):
+        """
+        Load grammars up front and create this thread's parsers for them.
+
+        Grammars are loaded once per process, so calling this again (or
+        from another ASTAnalyzer) only creates parsers. Call it at startup
+        to keep grammar loading out of the first file's latency.
+
+        Args:
+            languages: Normalized language names
+        """
+        parsers = getattr(self._local, 'parsers', None)
+        if parsers is None:
+            parsers = self._local.parsers = {}
+
+        for lang in languages:
+            language = _load_language(lang)
+            if language is None:
+                continue
+
+            try:
+                parser = _new_parser(language)
+            except Exception as e:
+                logger.warning(f"Could not load parser for {lang}: {e}")
+                continue
+
+            # The calling thread reuses the parsers it just created
+            self.parsers[lang] = parsers[lang] = parser
+            logger.debug(f"Loaded tree-sitter parser for {lang}")
+
+    def get_parser(self, lang_key: str):
+        """
+        Get the calling thread's parser for a language.
+
+        Args:
+            lang_key: Normalized language name
+
+        Returns:
+            tree-sitter Parser or None if the language isn't supported
+        """
+        if lang_key not in self.parsers:
+            return None
+
+        parsers = getattr(self._local, 'parsers', None)
+        if parsers is None:
+            parsers = self._local.parsers = {}
+
+        parser = parsers.get(lang_key)
+        if parser is None:
+            parser = parsers[lang_key] = _new_parser(_load_language(lang_key))
+
+        return parser
 
     def analyze_file(self, file_path: Path, language: str, code: str) -> Optional[CallGraph]:
         """
@@ -119,6 +227,14 @@ class ASTAnalyzer:
         Returns:
             CallGraph object or None if analysis failed
         """
+        lang_key = self._resolve_language(language)
+        if lang_key is None:
+            return None
+
+        return self._parse_and_analyze(lang_key, file_path, code)
+
+    def _resolve_language(self, language: str) -> Optional[str]:
+        """Normalize a language name and check a parser is available for it."""
         if not self.tree_sitter_available:
             logger.warning("tree-sitter not available, skipping AST analysis")
             return None
@@ -131,8 +247,17 @@ class ASTAnalyzer:
             logger.warning(f"No parser available for {language} (normalized: {lang_key}). Available: {list(self.parsers.keys())}")
             return None
 
+        return lang_key
+
+    def _parse_and_analyze(
+        self,
+        lang_key: str,
+        file_path: Path,
+        code: str
+    ) -> Optional[CallGraph]:
+        """Parse code and run the language-specific analyzer on the tree."""
         try:
-            parser = self.parsers[lang_key]
+            parser = self.get_parser(lang_key)
             tree = parser.parse(bytes(code, "utf8"))
 
             # Use strategy pattern: get appropriate analyzer for language
@@ -206,6 +331,8 @@ class ASTAnalyzer:
                         parameters=params,
                         return_type=None,  # TODO: extract from annotations
                         line_number=node.start_point[0] + 1,
+                        start_byte=node.start_byte,
+                        end_byte=node.end_byte,
                         is_async=is_async
                     )
 
@@ -261,7 +388,7 @@ class ASTAnalyzer:
 
                     import_stmt = ImportStatement(
                         module=module_name,
-                        imported_names=imported
+                        imported_names=frozenset(imported)
                     )
                     imports.append(import_stmt)
 
@@ -356,6 +483,8 @@ class ASTAnalyzer:
                         parameters=params,
                         return_type=None,
                         line_number=node.start_point[0] + 1,
+                        start_byte=node.start_byte,
+                        end_byte=node.end_byte,
                         is_async=False,
                         is_method=parent_function is not None
                     ))
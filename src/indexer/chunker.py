@@ -1,7 +1,14 @@
 """Code chunking for large files."""
 
+import ast
+import asyncio
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import accumulate
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 import tiktoken
 
@@ -10,6 +17,89 @@ from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+try:
+    from tree_sitter_languages import get_parser as _ts_get_parser
+except ImportError:
+    _ts_get_parser = None
+
+# Top-level JS/TS nodes that start a new chunk segment
+_TS_BOUNDARY_NODES = frozenset({
+    'function_declaration',
+    'method_definition',
+    'class_declaration',
+    'export_statement',
+})
+
+# One thread-local parser holder per language; parsers are not thread-safe
+# but are expensive enough to create that we reuse them per worker thread
+_PARSER_POOL: Dict[str, threading.local] = {}
+_PARSER_POOL_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """
+    Load the tiktoken encoding for a model once and reuse it.
+
+    Failures are cached too (as None), so the fallback warning and the
+    try/except are only paid on the first call.
+
+    Args:
+        model: Model name for tokenizer.
+
+    Returns:
+        tiktoken Encoding, or None if it could not be loaded.
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:
+        logger.warning(f"Failed to use tiktoken: {e}, using fallback")
+        return None
+
+
+# Seconds before a failed chunk encoding load is retried (e.g. offline
+# with a cold tiktoken cache)
+_ENCODING_RETRY_SECONDS = 60.0
+
+_chunk_encoding = None
+_chunk_encoding_failed_at: Optional[float] = None
+_chunk_encoding_lock = threading.Lock()
+
+
+def _get_chunk_encoding():
+    """
+    Load the encoding used for chunk budgeting on first use.
+
+    Chunking only needs consistent counts, not exact counts for a specific
+    model, so the encoding is pinned by name (cl100k_base). tiktoken may
+    download it on a cold cache, so it is not loaded at import time, and a
+    failed load is retried after _ENCODING_RETRY_SECONDS rather than kept
+    for the life of the process.
+
+    Returns:
+        tiktoken Encoding, or None if it could not be loaded.
+    """
+    global _chunk_encoding, _chunk_encoding_failed_at
+
+    if _chunk_encoding is not None:
+        return _chunk_encoding
+
+    with _chunk_encoding_lock:
+        if _chunk_encoding is not None:
+            return _chunk_encoding
+
+        if (_chunk_encoding_failed_at is not None
+                and time.monotonic() - _chunk_encoding_failed_at < _ENCODING_RETRY_SECONDS):
+            return None
+
+        try:
+            _chunk_encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            _chunk_encoding_failed_at = time.monotonic()
+            logger.warning(f"Failed to use tiktoken: {e}, using fallback")
+
+    return _chunk_encoding
+
 
 def estimate_tokens(text: str, model: str = "gpt-4") -> int:
     """
@@ -17,18 +107,32 @@ def estimate_tokens(text: str, model: str = "gpt-4") -> int:
 
     Args:
         text: Text to count tokens for.
-        model: Model name for tokenizer.
+        model: Unused; kept for compatibility. Counts always use cl100k_base.
 
     Returns:
         Estimated token count.
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
-    except Exception as e:
+    encoding = _get_chunk_encoding()
+    if encoding is None:
         # Fallback: rough estimate
-        logger.warning(f"Failed to use tiktoken: {e}, using fallback")
         return len(text) // 4  # Rough approximation
+    return len(encoding.encode_ordinary(text))
+
+
+def _count_line_tokens(lines: List[str]) -> List[int]:
+    """
+    Count tokens for every line in a single batched tokenizer call.
+
+    Args:
+        lines: File lines.
+
+    Returns:
+        Token count per line, aligned with lines.
+    """
+    encoding = _get_chunk_encoding()
+    if encoding is None:
+        return [len(line) // 4 for line in lines]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(lines)]
 
 
 async def chunk_code_file(
@@ -41,6 +145,33 @@ async def chunk_code_file(
     """
     Intelligently chunk large code files.
 
+    Args:
+        content: File content.
+        file_path: Path to file.
+        language: Programming language.
+        max_tokens: Maximum tokens per chunk.
+        overlap_tokens: Overlap between chunks.
+
+    Returns:
+        List of CodeChunk objects.
+    """
+    # Chunking is pure CPU work; run it off the event loop so a large file
+    # doesn't stall other concurrent indexing tasks
+    return await asyncio.to_thread(
+        _chunk_sync, content, file_path, language, max_tokens, overlap_tokens
+    )
+
+
+def _chunk_sync(
+    content: str,
+    file_path: Path,
+    language: str,
+    max_tokens: int,
+    overlap_tokens: int
+) -> List[CodeChunk]:
+    """
+    Synchronous body of chunk_code_file.
+
     Args:
         content: File content.
         file_path: Path to file.
@@ -54,44 +185,52 @@ async def chunk_code_file(
     # Estimate tokens
     total_tokens = estimate_tokens(content)
 
+    # Split into lines
+    lines = content.splitlines(keepends=True)
+
     # If small enough, return as single chunk
     if total_tokens <= max_tokens:
         return [CodeChunk(
-            content=content,
             chunk_index=0,
             total_chunks=1,
             start_line=1,
-            end_line=len(content.splitlines())
+            end_line=len(lines),
+            source_lines=lines
         )]
 
     logger.info(f"Chunking {file_path}: {total_tokens} tokens")
 
-    # Split into lines
-    lines = content.splitlines(keepends=True)
+    line_tok_counts = _count_line_tokens(lines)
 
     # Try structure-aware chunking for supported languages
     if language in ['python', 'javascript', 'typescript']:
-        chunks = await _structure_aware_chunk(lines, language, max_tokens, overlap_tokens)
+        chunks = _structure_aware_chunk(
+            lines, line_tok_counts, language, max_tokens, overlap_tokens
+        )
         if chunks:
             return chunks
 
     # Fallback: line-based chunking
-    return await _line_based_chunk(lines, max_tokens, overlap_tokens)
+    return _line_based_chunk(lines, line_tok_counts, max_tokens, overlap_tokens)
 
 
-async def _structure_aware_chunk(
+def _structure_aware_chunk(
     lines: List[str],
+    line_tok_counts: List[int],
     language: str,
     max_tokens: int,
     overlap_tokens: int
 ) -> List[CodeChunk]:
     """
-    Attempt structure-aware chunking (simplified).
+    Attempt structure-aware chunking.
 
-    This is a basic implementation. For production, use tree-sitter or ast module.
+    Chunks are aligned to top-level definition boundaries so functions and
+    classes are not split mid-body. A single definition larger than
+    max_tokens is split line-based with overlap.
 
     Args:
         lines: File lines.
+        line_tok_counts: Token count per line.
         language: Programming language.
         max_tokens: Max tokens per chunk.
         overlap_tokens: Overlap tokens.
@@ -99,73 +238,106 @@ async def _structure_aware_chunk(
     Returns:
         List of chunks or empty list if not possible.
     """
-    # For simplicity, we'll do basic function/class detection for Python
+    boundaries = None
     if language == "python":
-        chunks = []
-        current_chunk_lines = []
-        current_chunk_tokens = 0
-        chunk_index = 0
-        start_line = 1
-
-        for i, line in enumerate(lines, 1):
-            # Check if it's a function or class definition
-            is_boundary = line.strip().startswith(('def ', 'class ', 'async def '))
-
-            line_tokens = estimate_tokens(line)
-
-            # If adding this line exceeds max and we have content, create chunk
-            if current_chunk_tokens + line_tokens > max_tokens and current_chunk_lines:
-                chunk_content = ''.join(current_chunk_lines)
-                chunks.append(CodeChunk(
-                    content=chunk_content,
-                    chunk_index=chunk_index,
-                    total_chunks=0,  # Will update later
-                    start_line=start_line,
-                    end_line=i - 1
-                ))
-
-                # Start new chunk with overlap
-                overlap_lines = []
-                overlap_tokens_count = 0
-                for ol in reversed(current_chunk_lines):
-                    ol_tokens = estimate_tokens(ol)
-                    if overlap_tokens_count + ol_tokens <= overlap_tokens:
-                        overlap_lines.insert(0, ol)
-                        overlap_tokens_count += ol_tokens
-                    else:
-                        break
-
-                current_chunk_lines = overlap_lines
-                current_chunk_tokens = overlap_tokens_count
-                chunk_index += 1
-                start_line = i
-
-            current_chunk_lines.append(line)
-            current_chunk_tokens += line_tokens
-
-        # Add final chunk
-        if current_chunk_lines:
-            chunk_content = ''.join(current_chunk_lines)
-            chunks.append(CodeChunk(
-                content=chunk_content,
-                chunk_index=chunk_index,
-                total_chunks=0,
-                start_line=start_line,
-                end_line=len(lines)
-            ))
-
-        # Update total_chunks
-        total = len(chunks)
-        for chunk in chunks:
-            chunk.total_chunks = total
-
-        return chunks
-
-    return []
-
-
-async def _line_based_chunk(
+        boundaries = _python_boundaries(''.join(lines))
+    elif language in ('javascript', 'typescript'):
+        boundaries = _tree_sitter_boundaries(''.join(lines), language)
+
+    if boundaries is None:
+        return []
+
+    prefix = list(accumulate(line_tok_counts, initial=0))
+    spans = _pack_segments(prefix, boundaries, len(lines), max_tokens, overlap_tokens)
+    return _build_chunks(lines, spans)
+
+
+def _python_boundaries(content: str) -> Optional[List[int]]:
+    """
+    Find top-level definition boundaries in Python source.
+
+    Args:
+        content: File content.
+
+    Returns:
+        Sorted 0-based line indices where a top-level function/class starts
+        (including its decorators) or ends, or None if the file doesn't parse.
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    boundaries = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            first_line = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            boundaries.add(first_line - 1)
+            boundaries.add(node.end_lineno)
+
+    return sorted(boundaries)
+
+
+def _get_parser(language: str):
+    """
+    Get this thread's tree-sitter parser for a language.
+
+    Args:
+        language: tree-sitter language name.
+
+    Returns:
+        Parser, or None if tree-sitter is not available for the language.
+    """
+    if _ts_get_parser is None:
+        return None
+
+    local = _PARSER_POOL.get(language)
+    if local is None:
+        with _PARSER_POOL_LOCK:
+            local = _PARSER_POOL.setdefault(language, threading.local())
+
+    parser = getattr(local, 'parser', None)
+    if parser is None:
+        try:
+            parser = _ts_get_parser(language)
+        except Exception as e:
+            logger.debug(f"No tree-sitter parser for {language}: {e}")
+            return None
+        local.parser = parser
+
+    return parser
+
+
+def _tree_sitter_boundaries(content: str, language: str) -> Optional[List[int]]:
+    """
+    Find top-level definition boundaries in JS/TS source via tree-sitter.
+
+    Args:
+        content: File content.
+        language: tree-sitter language name.
+
+    Returns:
+        Sorted 0-based line indices where a top-level definition starts or
+        ends, or None if no parser is available.
+    """
+    parser = _get_parser(language)
+    if parser is None:
+        return None
+
+    tree = parser.parse(bytes(content, "utf8"))
+
+    boundaries = set()
+    for node in tree.root_node.children:
+        if node.type in _TS_BOUNDARY_NODES:
+            boundaries.add(node.start_point[0])
+            boundaries.add(node.end_point[0] + 1)
+
+    return sorted(boundaries)
+
+
+def _line_based_chunk(
     lines: List[str],
+    line_tok_counts: List[int],
     max_tokens: int,
     overlap_tokens: int
 ) -> List[CodeChunk]:
@@ -174,65 +346,117 @@ async def _line_based_chunk(
 
     Args:
         lines: File lines.
+        line_tok_counts: Token count per line.
         max_tokens: Max tokens per chunk.
         overlap_tokens: Overlap tokens.
 
     Returns:
         List of CodeChunk objects.
     """
-    chunks = []
-    current_lines = []
-    current_tokens = 0
-    chunk_index = 0
-    start_line = 1
-
-    for i, line in enumerate(lines, 1):
-        line_tokens = estimate_tokens(line)
-
-        # If adding this line exceeds max, create chunk
-        if current_tokens + line_tokens > max_tokens and current_lines:
-            chunk_content = ''.join(current_lines)
-            chunks.append(CodeChunk(
-                content=chunk_content,
-                chunk_index=chunk_index,
-                total_chunks=0,
-                start_line=start_line,
-                end_line=i - 1
-            ))
-
-            # Calculate overlap
-            overlap_lines = []
-            overlap_tokens_count = 0
-            for ol in reversed(current_lines):
-                ol_tokens = estimate_tokens(ol)
-                if overlap_tokens_count + ol_tokens <= overlap_tokens:
-                    overlap_lines.insert(0, ol)
-                    overlap_tokens_count += ol_tokens
-                else:
-                    break
-
-            current_lines = overlap_lines
-            current_tokens = overlap_tokens_count
-            chunk_index += 1
-            start_line = i
-
-        current_lines.append(line)
-        current_tokens += line_tokens
-
-    # Add final chunk
-    if current_lines:
-        chunk_content = ''.join(current_lines)
-        chunks.append(CodeChunk(
-            content=chunk_content,
-            chunk_index=chunk_index,
-            total_chunks=0,
-            start_line=start_line,
-            end_line=len(lines)
-        ))
+    prefix = list(accumulate(line_tok_counts, initial=0))
+    spans = _pack_spans(prefix, 0, len(lines), max_tokens, overlap_tokens)
+    return _build_chunks(lines, spans)
+
+
+def _pack_spans(
+    prefix: List[int],
+    start: int,
+    stop: int,
+    max_tokens: int,
+    overlap_tokens: int
+) -> List[Tuple[int, int]]:
+    """
+    Greedily pack lines[start:stop] into (start, end) index spans.
+
+    Each span holds as many lines as fit in max_tokens (at least one), and
+    the next span starts at the longest suffix of the previous one that fits
+    in overlap_tokens. Token sums come from the prefix-sum array, so both
+    boundaries are found by binary search.
+
+    Args:
+        prefix: Prefix sums of per-line token counts (prefix[0] == 0).
+        start: First line index to pack.
+        stop: Line index to stop at (exclusive).
+        max_tokens: Max tokens per chunk.
+        overlap_tokens: Overlap tokens.
+
+    Returns:
+        List of (start, end) line index pairs, end exclusive.
+    """
+    spans = []
+    while start < stop:
+        end = bisect_right(prefix, prefix[start] + max_tokens, start + 1, stop + 1) - 1
+        end = max(end, start + 1)
+        spans.append((start, end))
+        if end >= stop:
+            break
 
-    # Update total_chunks
-    total = len(chunks)
-    for chunk in chunks:
-        chunk.total_chunks = total
+        # Next chunk starts with the largest suffix that fits in the overlap
+        start = bisect_left(prefix, prefix[end] - overlap_tokens, start + 1, end)
 
-    return chunks
+    return spans
+
+
+def _pack_segments(
+    prefix: List[int],
+    boundaries: List[int],
+    stop: int,
+    max_tokens: int,
+    overlap_tokens: int
+) -> List[Tuple[int, int]]:
+    """
+    Greedily merge consecutive segments between boundaries into spans.
+
+    Args:
+        prefix: Prefix sums of per-line token counts (prefix[0] == 0).
+        boundaries: Sorted line indices where segments may be cut.
+        stop: Number of lines.
+        max_tokens: Max tokens per chunk.
+        overlap_tokens: Overlap tokens for oversized segments.
+
+    Returns:
+        List of (start, end) line index pairs, end exclusive.
+    """
+    bounds = [0] + [b for b in boundaries if 0 < b < stop] + [stop]
+    bound_tokens = [prefix[b] for b in bounds]
+
+    spans = []
+    i = 0
+    while i < len(bounds) - 1:
+        # Furthest boundary that keeps the merged segments within max_tokens
+        j = bisect_right(bound_tokens, bound_tokens[i] + max_tokens, i + 1) - 1
+        if j > i:
+            spans.append((bounds[i], bounds[j]))
+            i = j
+        else:
+            # Single segment too large: split it line-based
+            spans.extend(_pack_spans(prefix, bounds[i], bounds[i + 1], max_tokens, overlap_tokens))
+            i += 1
+
+    return spans
+
+
+def _build_chunks(lines: List[str], spans: List[Tuple[int, int]]) -> List[CodeChunk]:
+    """
+    Build CodeChunk objects for line index spans.
+
+    Chunks reference the shared lines list; their content is joined lazily.
+
+    Args:
+        lines: File lines.
+        spans: (start, end) line index pairs, end exclusive.
+
+    Returns:
+        List of CodeChunk objects.
+    """
+    total = len(spans)
+    return [
+        CodeChunk(
+            chunk_index=chunk_index,
+            total_chunks=total,
+            start_line=start + 1,
+            end_line=end,
+            source_lines=lines
+        )
+        for chunk_index, (start, end) in enumerate(spans)
+    ]
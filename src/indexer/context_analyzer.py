@@ -1,12 +1,17 @@
 """Analyzes project context before indexing individual files."""
 
+import asyncio
 import json
+import os
+import re
+import tomllib
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 from ..providers.base import LLMProvider, ChatMessage
 from ..storage.models import ProjectContext
 from ..utils.logger import get_logger
+from ..utils.text import decode_text
 
 logger = get_logger(__name__)
 
@@ -23,6 +28,16 @@ CONFIG_FILES = {
     "dotnet": ["*.csproj", "*.sln", "packages.config"],
 }
 
+# Directories never shown in the project tree (hidden entries are skipped too)
+_EXCLUDE = frozenset({'node_modules', '__pycache__', 'venv', '.venv'})
+
+# Bytes read from each documentation file: docs are truncated to 2000 chars,
+# and a UTF-8 character is at most 4 bytes
+_DOC_READ_BYTES = 2000 * 4
+
+# Splits a PEP 508 requirement at the first version specifier, extra or marker
+_REQUIREMENT_SPEC_RE = re.compile(r'[<>=~!;\[\s]')
+
 # Framework detection patterns
 FRAMEWORK_PATTERNS = {
     "fastapi": ["fastapi", "FastAPI"],
@@ -38,6 +53,17 @@ FRAMEWORK_PATTERNS = {
     "rails": ["rails"],
 }
 
+# All framework patterns compiled into one scan; the lookahead makes
+# finditer report every (possibly overlapping) pattern occurrence
+_FRAMEWORK_BY_PATTERN = {
+    pattern: framework
+    for framework, patterns in FRAMEWORK_PATTERNS.items()
+    for pattern in patterns
+}
+_FRAMEWORK_RE = re.compile(
+    "(?=(" + "|".join(re.escape(p) for p in _FRAMEWORK_BY_PATTERN) + "))"
+)
+
 
 async def analyze_project_context(
     project_path: Path,
@@ -70,7 +96,7 @@ async def analyze_project_context(
     tech_info = await detect_tech_stack(project_path)
 
     # Step 3: Read key documentation files
-    docs = await read_key_files(project_path)
+    docs = await read_key_files(project_path, _list_names(project_path))
 
     # Step 4: Prepare prompt
     prompt = _build_context_prompt(project_path, file_tree, tech_info, docs)
@@ -160,34 +186,35 @@ async def build_file_tree_summary(project_path: Path, max_depth: int = 3) -> str
         String representation of directory tree.
     """
 
-    def walk_directory(path: Path, current_depth: int, prefix: str = "") -> List[str]:
-        """Recursively walk directory."""
-        if current_depth > max_depth:
-            return []
+    # Collect listings top-down, pruning hidden/excluded subtrees in place
+    # so os.walk never descends into them
+    listings = {}
+    for root, dirs, files in os.walk(project_path, topdown=True):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in _EXCLUDE)
+        files = sorted(f for f in files if not f.startswith('.'))
+        listings[root] = [(d, True) for d in dirs] + [(f, False) for f in files]
 
-        lines = []
-        try:
-            items = sorted(path.iterdir(), key=lambda p: (not p.is_dir(), p.name))
-            for i, item in enumerate(items):
-                # Skip hidden files and common excludes
-                if item.name.startswith('.') or item.name in ['node_modules', '__pycache__', 'venv', '.venv']:
-                    continue
-
-                is_last = i == len(items) - 1
-                connector = "└── " if is_last else "├── "
-                lines.append(f"{prefix}{connector}{item.name}{'/' if item.is_dir() else ''}")
+        depth = len(Path(root).relative_to(project_path).parts)
+        if depth >= max_depth:
+            dirs[:] = []
 
-                if item.is_dir() and current_depth < max_depth:
-                    extension = "    " if is_last else "│   "
-                    lines.extend(walk_directory(item, current_depth + 1, prefix + extension))
+    def render(path: str, prefix: str = "") -> List[str]:
+        """Format collected listings as a box-drawing tree."""
+        lines = []
+        items = listings.get(path, [])
+        for i, (name, is_dir) in enumerate(items):
+            is_last = i == len(items) - 1
+            connector = "└── " if is_last else "├── "
+            lines.append(f"{prefix}{connector}{name}{'/' if is_dir else ''}")
 
-        except PermissionError:
-            pass
+            if is_dir:
+                extension = "    " if is_last else "│   "
+                lines.extend(render(os.path.join(path, name), prefix + extension))
 
         return lines
 
     tree_lines = [f"{project_path.name}/"]
-    tree_lines.extend(walk_directory(project_path, 0))
+    tree_lines.extend(render(str(project_path)))
     return "\n".join(tree_lines)
 
 
@@ -231,22 +258,30 @@ async def detect_tech_stack(project_path: Path) -> Dict[str, any]:
                         info["dependencies"].extend(deps)
 
                         # Detect frameworks
-                        for framework, patterns in FRAMEWORK_PATTERNS.items():
-                            if any(pattern in dep for dep in deps for pattern in patterns):
-                                if framework not in info["frameworks"]:
-                                    info["frameworks"].append(framework)
+                        found = {
+                            _FRAMEWORK_BY_PATTERN[match.group(1)]
+                            for dep in deps
+                            for match in _FRAMEWORK_RE.finditer(dep)
+                        }
+                        for framework in FRAMEWORK_PATTERNS:
+                            if framework in found and framework not in info["frameworks"]:
+                                info["frameworks"].append(framework)
                     except Exception as e:
                         logger.warning(f"Failed to parse {config_file}: {e}")
 
     return info
 
 
-async def read_key_files(project_path: Path) -> Dict[str, str]:
+async def read_key_files(
+    project_path: Path,
+    root_names: Optional[Set[str]] = None
+) -> Dict[str, str]:
     """
     Read README and other key documentation files.
 
     Args:
         project_path: Project root path.
+        root_names: Names in the project root, if already listed.
 
     Returns:
         Dictionary mapping filename to content (truncated if needed).
@@ -260,19 +295,46 @@ async def read_key_files(project_path: Path) -> Dict[str, str]:
         "docs/index.md", "docs/README.md"
     ]
 
-    for filename in doc_files:
-        file_path = project_path / filename
-        if file_path.exists() and file_path.is_file():
-            try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                # Truncate to first 2000 characters
-                docs[filename] = content[:2000] if len(content) > 2000 else content
-            except Exception as e:
-                logger.warning(f"Failed to read {filename}: {e}")
+    # Check candidates against directory listings instead of one stat each
+    if root_names is None:
+        root_names = _list_names(project_path)
+    docs_names = _list_names(project_path / "docs") if "docs" in root_names else set()
+    doc_files = [
+        filename for filename in doc_files
+        if (filename[len("docs/"):] in docs_names if filename.startswith("docs/") else filename in root_names)
+    ]
+
+    def read_head(file_path: Path) -> Optional[str]:
+        """Read the start of a file, or None if it isn't a regular file."""
+        if not file_path.is_file():
+            return None
+        # Only the first 2000 characters are used, so never load a whole large README
+        with file_path.open('rb') as f:
+            return decode_text(f.read(_DOC_READ_BYTES))[:2000]
+
+    # Read candidates concurrently so disk latency isn't paid once per file
+    results = await asyncio.gather(
+        *(asyncio.to_thread(read_head, project_path / filename) for filename in doc_files),
+        return_exceptions=True
+    )
+
+    for filename, result in zip(doc_files, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to read {filename}: {result}")
+        elif result is not None:
+            docs[filename] = result
 
     return docs
 
 
+def _list_names(path: Path) -> Set[str]:
+    """List entry names in a directory, or an empty set if it can't be read."""
+    try:
+        return set(os.listdir(path))
+    except OSError:
+        return set()
+
+
 async def _parse_dependencies(config_file: Path, lang: str) -> List[str]:
     """
     Parse dependencies from configuration file.
@@ -295,20 +357,25 @@ async def _parse_dependencies(config_file: Path, lang: str) -> List[str]:
                 for line in content.split('\n'):
                     line = line.strip()
                     if line and not line.startswith('#'):
-                        # Extract package name (before ==, >=, etc.)
-                        pkg = line.split('==')[0].split('>=')[0].split('<=')[0].split('~=')[0].strip()
-                        deps.append(pkg)
+                        # Extract package name (before ==, >=, extras, markers, etc.)
+                        deps.append(_REQUIREMENT_SPEC_RE.split(line, 1)[0])
 
             elif config_file.name == "pyproject.toml":
-                # Simple TOML parsing for dependencies
-                import re
-                # Find dependencies section
-                matches = re.findall(r'"([^"]+)"', content)
-                deps.extend([m for m in matches if '=' not in m and '/' not in m])
+                data = tomllib.loads(content)
+                project = data.get("project", {})
+                requirements = list(project.get("dependencies", []))
+                for group in project.get("optional-dependencies", {}).values():
+                    requirements.extend(group)
+
+                # Strip version specifiers, extras and markers
+                deps.extend(_REQUIREMENT_SPEC_RE.split(req, 1)[0] for req in requirements)
+
+                # Poetry keeps dependencies as a table keyed by name
+                poetry_deps = data.get("tool", {}).get("poetry", {}).get("dependencies", {})
+                deps.extend(name for name in poetry_deps if name != "python")
 
         elif lang == "nodejs":
             if config_file.name == "package.json":
-                import json
                 data = json.loads(content)
                 if "dependencies" in data:
                     deps.extend(data["dependencies"].keys())
@@ -317,20 +384,8 @@ async def _parse_dependencies(config_file: Path, lang: str) -> List[str]:
 
         elif lang == "rust":
             if config_file.name == "Cargo.toml":
-                # Simple TOML parsing
-                import re
-                # Find dependencies in [dependencies] section
-                in_deps = False
-                for line in content.split('\n'):
-                    if '[dependencies]' in line:
-                        in_deps = True
-                        continue
-                    if in_deps and line.startswith('['):
-                        break
-                    if in_deps and '=' in line:
-                        dep_name = line.split('=')[0].strip()
-                        if dep_name:
-                            deps.append(dep_name)
+                data = tomllib.loads(content)
+                deps.extend(data.get("dependencies", {}).keys())
 
     except Exception as e:
         logger.warning(f"Error parsing dependencies from {config_file}: {e}")
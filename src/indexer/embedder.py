@@ -1,21 +1,48 @@
 """Embedding generation using OpenAI."""
 
+import asyncio
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import List, Optional
 
+import numpy as np
 from openai import AsyncOpenAI
 
+from .chunker import _get_encoding
+from ..providers.base import EmbeddingProvider
+from ..storage.embedding_cache import EmbeddingCache
 from ..storage.models import CodeAnalysis, ProjectContext
 from ..utils.logger import get_logger
+from ..utils.rate_limiter import RateLimiter
 
 logger = get_logger(__name__)
 
+# Token budgets for embedding input (text-embedding-3-* accept 8191 tokens)
+CODE_PREVIEW_TOKENS = 1500
+MAX_EMBEDDING_TOKENS = 8000
+
+# Embedding dimensions by model, for zero-vector fallbacks
+_EMBEDDING_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536
+}
+
+
+@lru_cache(maxsize=None)
+def _zero_embedding(model: str) -> np.ndarray:
+    """Shared read-only zero vector used as the fallback embedding for a model."""
+    vector = np.zeros(_EMBEDDING_DIMENSIONS.get(model, 1536), dtype=np.float32)
+    vector.setflags(write=False)
+    return vector
+
 
 async def generate_embedding(
     text: str,
     client: AsyncOpenAI,
-    model: str = "text-embedding-3-small"
-) -> List[float]:
+    model: str = "text-embedding-3-small",
+    cache: Optional[EmbeddingCache] = None
+) -> np.ndarray:
     """
     Generate embedding for text using OpenAI.
 
@@ -23,16 +50,25 @@ async def generate_embedding(
         text: Text to embed.
         client: OpenAI async client.
         model: Embedding model to use.
+        cache: Optional embedding cache to consult before calling the API.
 
     Returns:
-        List of floats representing the embedding.
+        Embedding as a float32 ndarray.
     """
+    if cache is not None:
+        cached = cache.get(model, text, _EMBEDDING_DIMENSIONS.get(model, 1536))
+        if cached is not None:
+            return cached
+
     try:
         response = await client.embeddings.create(
             input=text,
             model=model
         )
-        return response.data[0].embedding
+        embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+        if cache is not None:
+            cache.put(model, text, embedding, _EMBEDDING_DIMENSIONS.get(model, 1536))
+        return embedding
     except Exception as e:
         logger.error(f"Failed to generate embedding: {e}")
         raise
@@ -42,47 +78,170 @@ async def batch_generate_embeddings(
     texts: List[str],
     client: AsyncOpenAI,
     model: str = "text-embedding-3-small",
-    max_batch_size: int = 100
-) -> List[List[float]]:
+    max_batch_size: int = 100,
+    max_concurrent_batches: int = 8,
+    cache: Optional[EmbeddingCache] = None
+) -> List[np.ndarray]:
     """
     Generate embeddings for multiple texts in batches.
 
+    Batches are sent concurrently, bounded by max_concurrent_batches. With a
+    cache, only texts that miss it are sent to the API.
+
     Args:
         texts: List of texts to embed.
         client: OpenAI async client.
         model: Embedding model to use.
         max_batch_size: Maximum batch size.
+        max_concurrent_batches: Maximum batch requests in flight.
+        cache: Optional embedding cache to consult before calling the API.
 
     Returns:
-        List of embeddings.
+        List of float32 embeddings.
     """
-    embeddings = []
+    if cache is not None:
+        dimension = _EMBEDDING_DIMENSIONS.get(model, 1536)
+        embeddings = await asyncio.to_thread(cache.get_many, model, texts, dimension)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            fetched = await batch_generate_embeddings(
+                missing_texts, client, model, max_batch_size, max_concurrent_batches
+            )
+            for i, embedding in zip(missing, fetched):
+                embeddings[i] = embedding
 
-    # Process in batches
-    for i in range(0, len(texts), max_batch_size):
-        batch = texts[i:i + max_batch_size]
-        logger.debug(f"Generating embeddings for batch {i // max_batch_size + 1}")
-
-        try:
-            response = await client.embeddings.create(
-                input=batch,
-                model=model
+            # Don't cache zero-vector fallbacks from failed requests
+            successful = [(text, emb) for text, emb in zip(missing_texts, fetched) if emb.any()]
+            await asyncio.to_thread(
+                cache.put_many,
+                model,
+                [text for text, _ in successful],
+                [emb for _, emb in successful],
+                dimension
             )
-            batch_embeddings = [item.embedding for item in response.data]
-            embeddings.extend(batch_embeddings)
 
-        except Exception as e:
-            logger.error(f"Failed to generate embeddings for batch: {e}")
-            # Generate individually for this batch
-            for text in batch:
-                try:
-                    emb = await generate_embedding(text, client, model)
-                    embeddings.append(emb)
-                except:
-                    # Use zero vector as fallback
-                    embeddings.append([0.0] * 1536)
+        logger.debug(f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} hits")
+        return embeddings
+
+    semaphore = asyncio.Semaphore(max_concurrent_batches)
+
+    async def embed_with_semaphore(batch_number: int, batch: List[str]) -> List[np.ndarray]:
+        async with semaphore:
+            logger.debug(f"Generating embeddings for batch {batch_number}")
+            return await _embed_batch(client, batch, model)
+
+    # Process in batches
+    results = await asyncio.gather(*[
+        embed_with_semaphore(i // max_batch_size + 1, texts[i:i + max_batch_size])
+        for i in range(0, len(texts), max_batch_size)
+    ])
+
+    return [embedding for batch_embeddings in results for embedding in batch_embeddings]
+
+
+async def create_embeddings_cached(
+    texts: List[str],
+    provider: EmbeddingProvider,
+    cache: Optional[EmbeddingCache] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    batch_size: Optional[int] = None
+) -> List[np.ndarray]:
+    """
+    Embed texts through an embedding provider, skipping cached ones.
+
+    Each distinct text is sent to the provider at most once per call.
+    Cache entries are keyed by the provider's model and dimension, so
+    switching either invalidates them implicitly.
+
+    Args:
+        texts: Texts to embed.
+        provider: Embedding provider.
+        cache: Optional embedding cache.
+        rate_limiter: Optional rate limiter; each provider request acquires
+            it and is retried through it.
+        batch_size: Maximum texts per provider request (default: one request).
+
+    Returns:
+        Embeddings in the same order as texts.
+    """
+    model = provider.model_name
+    dimension = provider.dimension
+
+    # Duplicates within texts collapse to one entry
+    unique = list(dict.fromkeys(texts))
+    embeddings = {}
+
+    if cache is not None and unique:
+        # SQLite lookups and writes stay off the event loop
+        cached = await asyncio.to_thread(cache.get_many, model, unique, dimension)
+        embeddings.update(
+            (text, embedding) for text, embedding in zip(unique, cached) if embedding is not None
+        )
+
+    missing = [text for text in unique if text not in embeddings]
+    step = batch_size or len(missing) or 1
+
+    for start in range(0, len(missing), step):
+        batch = missing[start:start + step]
+        request = partial(provider.create_embeddings, batch)
+
+        if rate_limiter is not None:
+            await rate_limiter.acquire(tokens=500 * len(batch), request_count=1)
+            vectors = await rate_limiter.execute_with_retry(request)
+        else:
+            vectors = await request()
+
+        embeddings.update(zip(batch, vectors))
 
-    return embeddings
+        if cache is not None:
+            await asyncio.to_thread(cache.put_many, model, batch, vectors, dimension)
+
+    logger.debug(f"Embedding cache: {len(unique) - len(missing)}/{len(unique)} hits")
+    return [embeddings[text] for text in texts]
+
+
+async def _embed_batch(
+    client: AsyncOpenAI,
+    texts: List[str],
+    model: str
+) -> List[np.ndarray]:
+    """
+    Embed a batch, bisecting on failure to isolate bad items.
+
+    A failing batch is split in half and both halves are retried, so a
+    single oversized or rejected text costs O(log N) extra requests instead
+    of falling back to one request per text.
+
+    Args:
+        client: OpenAI async client.
+        texts: Texts to embed.
+        model: Embedding model to use.
+
+    Returns:
+        List of float32 embeddings, aligned with texts.
+    """
+    try:
+        response = await client.embeddings.create(
+            input=texts,
+            model=model
+        )
+        # One (N, D) conversion for the batch; rows are views into it
+        return list(np.asarray([item.embedding for item in response.data], dtype=np.float32))
+
+    except Exception as e:
+        if len(texts) == 1:
+            logger.error(f"Failed to generate embedding: {e}")
+            # Use zero vector as fallback
+            return [_zero_embedding(model)]
+
+        logger.warning(f"Failed to generate embeddings for batch of {len(texts)}, splitting: {e}")
+        mid = len(texts) // 2
+        left, right = await asyncio.gather(
+            _embed_batch(client, texts[:mid], model),
+            _embed_batch(client, texts[mid:], model)
+        )
+        return left + right
 
 
 def prepare_embedding_text(
@@ -109,9 +268,7 @@ def prepare_embedding_text(
 
     # Add project context if available
     if project_context:
-        parts.append(f"Project: {project_context.project_name}")
-        if project_context.tech_stack:
-            parts.append(f"Stack: {', '.join(project_context.tech_stack[:5])}")
+        parts.append(project_context.embedding_header)
 
     # Add file info
     parts.append(f"File: {file_path}")
@@ -135,7 +292,30 @@ def prepare_embedding_text(
             parts.append("Functions:\n" + "\n".join(func_summaries))
 
     # Add code (truncated if needed)
-    code_preview = code[:2000] if len(code) > 2000 else code
+    code_preview = _truncate_tokens(code, CODE_PREVIEW_TOKENS)
     parts.append(f"\nCode:\n{code_preview}")
 
-    return "\n".join(parts)
+    return _truncate_tokens("\n".join(parts), MAX_EMBEDDING_TOKENS)
+
+
+def _truncate_tokens(text: str, max_tokens: int, model: str = "text-embedding-3-small") -> str:
+    """
+    Clip text to at most max_tokens tokens.
+
+    Args:
+        text: Text to clip.
+        max_tokens: Token budget.
+        model: Model name for tokenizer.
+
+    Returns:
+        Text unchanged if within budget, otherwise its first max_tokens tokens.
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        # Fallback: same ~4 chars/token estimate as the chunker
+        return text[:max_tokens * 4]
+
+    tokens = encoding.encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
@@ -5,17 +5,36 @@ This module provides the best of both worlds:
 - LLM: Semantic understanding and natural language descriptions
 """
 
+import asyncio
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from ..providers.base import LLMProvider, ChatMessage
 from ..storage.call_graph_models import CallGraphRelation, EnhancedCodeAnalysis
 from ..storage.models import ProjectContext
+from ..storage.response_cache import ResponseCache
+from ..utils import fast_json
 from ..utils.logger import get_logger
 from .ast_analyzer import ASTAnalyzer
 
 logger = get_logger(__name__)
 
+# Cap on the caller source sent as code context with each description batch
+MAX_CALLER_CONTEXT_CHARS = 2000
+
+# Kept byte-identical across requests so providers can reuse the cached prefix
+CALL_DESCRIPTION_SYSTEM_PROMPT = """You are a code analyst.
+
+You will be given a list of function calls found in a source file, together
+with the surrounding code and, when available, the project context.
+
+For each function call, provide a brief description (1 sentence) of:
+1. What is the purpose of this call?
+2. What does it contribute to the overall logic?
+
+Return one description per call, in the same order as the calls are listed,
+as a JSON object of the form {"descriptions": ["...", "..."]}."""
+
 
 class EnhancedCodeAnalyzer:
     """
@@ -27,15 +46,25 @@ class EnhancedCodeAnalyzer:
     3. Combined result has both structure and meaning
     """
 
-    def __init__(self, llm_provider: LLMProvider):
+    def __init__(
+        self,
+        llm_provider: LLMProvider,
+        max_concurrent_llm_batches: int = 5,
+        response_cache: Optional[ResponseCache] = None
+    ):
         """
         Initialize analyzer.
 
         Args:
             llm_provider: LLM for semantic analysis
+            max_concurrent_llm_batches: Maximum description requests in flight
+                (see IndexingConfig.max_concurrent_llm_batches)
+            response_cache: Optional cache of LLM responses by exact prompt
         """
         self.llm_provider = llm_provider
+        self.response_cache = response_cache
         self.ast_analyzer = ASTAnalyzer()
+        self.llm_semaphore = asyncio.Semaphore(max_concurrent_llm_batches)
 
     async def analyze_file(
         self,
@@ -57,7 +86,11 @@ class EnhancedCodeAnalyzer:
             EnhancedCodeAnalysis with call graph and semantic info
         """
         # Step 1: AST Analysis (precise structure)
-        call_graph = self.ast_analyzer.analyze_file(file_path, language, code)
+        # Parsing is CPU-bound and tree-sitter releases the GIL, so run it on a
+        # worker thread to let concurrent files parse in parallel
+        call_graph = await asyncio.to_thread(
+            self.ast_analyzer.analyze_file, file_path, language, code
+        )
 
         if not call_graph:
             # Fallback to LLM-only analysis
@@ -78,7 +111,7 @@ class EnhancedCodeAnalyzer:
 
         # Step 4: Combine everything
         return EnhancedCodeAnalysis(
-            purpose=await self._generate_file_purpose(code, file_path, project_context),
+            purpose=self._generate_file_purpose(call_graph, file_path),
             dependencies=[imp.module for imp in call_graph.imports],
             exported_symbols=call_graph.exports,
             function_calls=call_relations,
@@ -88,6 +121,44 @@ class EnhancedCodeAnalyzer:
             type_usage=[]
         )
 
+    async def analyze_files(
+        self,
+        files: List[Tuple[str, Path, str]],
+        project_context: Optional[ProjectContext] = None,
+        max_concurrent: int = 10
+    ) -> List[Optional[EnhancedCodeAnalysis]]:
+        """
+        Analyze several files concurrently.
+
+        Args:
+            files: (code, file_path, language) tuples
+            project_context: Project context for better understanding
+            max_concurrent: Maximum files analyzed at once
+
+        Returns:
+            Analyses in input order, None for files that failed
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def analyze_with_semaphore(code: str, file_path: Path, language: str):
+            async with semaphore:
+                return await self.analyze_file(code, file_path, language, project_context)
+
+        results = await asyncio.gather(
+            *(analyze_with_semaphore(code, file_path, language) for code, file_path, language in files),
+            return_exceptions=True
+        )
+
+        analyses = []
+        for (_, file_path, _), result in zip(files, results):
+            if isinstance(result, Exception):
+                logger.error(f"Enhanced analysis failed for {file_path}: {result}")
+                analyses.append(None)
+            else:
+                analyses.append(result)
+
+        return analyses
+
     async def _enrich_call_graph_with_llm(
         self,
         call_graph,
@@ -115,15 +186,47 @@ class EnhancedCodeAnalyzer:
                 calls_by_function[call.caller_function] = []
             calls_by_function[call.caller_function].append(call)
 
-        # Process each function's calls
-        for caller_func, calls in calls_by_function.items():
-            descriptions = await self._describe_calls_with_llm(
-                calls,
-                code,
-                file_path,
-                project_context
-            )
+        # Send each batch only its caller's source instead of the file head
+        code_bytes = code.encode("utf8")
+        definitions = {
+            func.name: func for func in call_graph.functions
+            if func.end_byte > func.start_byte
+        }
+
+        def caller_context(caller_func: str) -> str:
+            func = definitions.get(caller_func)
+            if func is None:
+                return code
+            source = code_bytes[func.start_byte:func.end_byte].decode("utf8", errors="ignore")
+            return source[:MAX_CALLER_CONTEXT_CHARS]
+
+        async def describe(caller_func: str, calls: List) -> List[str]:
+            # Identical calls (e.g. repeated logging) are described once
+            # and the description is fanned back out to every occurrence
+            unique = {}
+            call_keys = []
+            for call in calls:
+                key = (call.callee_name, tuple(call.arguments[:3]))
+                unique.setdefault(key, call)
+                call_keys.append(key)
+
+            async with self.llm_semaphore:
+                descriptions = await self._describe_calls_with_llm(
+                    list(unique.values()),
+                    caller_context(caller_func),
+                    file_path,
+                    project_context
+                )
+
+            description_by_key = dict(zip(unique.keys(), descriptions))
+            return [description_by_key[key] for key in call_keys]
+
+        # Describe every function's calls concurrently, then collect
+        all_descriptions = await asyncio.gather(
+            *(describe(caller_func, calls) for caller_func, calls in calls_by_function.items())
+        )
 
+        for (caller_func, calls), descriptions in zip(calls_by_function.items(), all_descriptions):
             for call, description in zip(calls, descriptions):
                 relation = CallGraphRelation(
                     caller_file=str(file_path),
@@ -151,11 +254,36 @@ class EnhancedCodeAnalyzer:
         """
         Ask LLM to describe what each function call does.
 
+        code is the context shown to the model: the caller's source when
+        its span is known, otherwise the file (truncated).
+
         Returns list of descriptions matching the order of calls.
         """
         if not calls:
             return []
 
+        batch_size = len(calls[:10])
+
+        # Providers that honour structured output get a correctly sized list;
+        # the prompt still names the JSON shape for json_object-only providers
+        schema = {
+            "name": "call_descriptions",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "descriptions": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "minItems": batch_size,
+                        "maxItems": batch_size
+                    }
+                },
+                "required": ["descriptions"],
+                "additionalProperties": False
+            }
+        }
+
         # Build prompt with call context
         calls_info = "\n".join([
             f"- Line {call.line_number}: {call.callee_name}({', '.join(call.arguments[:3])})"
@@ -171,6 +299,8 @@ Project Context:
 - Stack: {', '.join(project_context.tech_stack)}
 """
 
+        # Static instructions live in the system message; everything that
+        # varies per call batch goes at the tail of the user message
         prompt = f"""{context_section}
 
 File: {file_path}
@@ -183,28 +313,50 @@ Code context:
 {code[:3000]}
 ```
 
-For each function call, provide a brief description (1 sentence) of:
-1. What is the purpose of this call?
-2. What does it contribute to the overall logic?
-
-Return as JSON array: ["description1", "description2", ...]
-Limit to {len(calls[:10])} descriptions matching the calls above.
+Provide exactly {batch_size} descriptions matching the calls above, as JSON.
 """
 
-        try:
-            response = await self.llm_provider.chat_completion(
-                messages=[
-                    ChatMessage(role="system", content="You are a code analyst."),
-                    ChatMessage(role="user", content=prompt)
-                ]
+        messages = [
+            ChatMessage(role="system", content=CALL_DESCRIPTION_SYSTEM_PROMPT),
+            ChatMessage(role="user", content=prompt)
+        ]
+
+        cache_key = None
+        content = None
+        if self.response_cache is not None:
+            cache_key = ResponseCache.make_key(
+                self.llm_provider.model_name, [m.content for m in messages]
             )
+            # SQLite lookups and writes stay off the event loop
+            content = await asyncio.to_thread(self.response_cache.get, cache_key)
+
+        try:
+            fetched = content is None
+            if fetched:
+                response = await self.llm_provider.chat_completion(
+                    messages=messages,
+                    response_format={"type": "json_schema", "json_schema": schema}
+                )
+                content = response.content
 
             # Parse response
-            import json
-            descriptions = json.loads(response.content)
+            result = fast_json.loads(content)
+            descriptions = result.get("descriptions", []) if isinstance(result, dict) else result
+
+            is_valid = (
+                isinstance(descriptions, list)
+                and len(descriptions) == batch_size
+                and all(isinstance(d, str) for d in descriptions)
+            )
+
+            # Only cache responses with the expected shape
+            if cache_key is not None and fetched and is_valid:
+                await asyncio.to_thread(self.response_cache.put, cache_key, content)
 
             if not isinstance(descriptions, list):
                 descriptions = [str(descriptions)] * len(calls)
+            elif not is_valid:
+                descriptions = [str(d) for d in descriptions]
 
             # Pad if needed
             while len(descriptions) < len(calls):
@@ -216,15 +368,16 @@ Limit to {len(calls[:10])} descriptions matching the calls above.
             logger.warning(f"Failed to get LLM descriptions: {e}")
             return ["Function call" for _ in calls]
 
-    async def _generate_file_purpose(
-        self,
-        code: str,
-        file_path: Path,
-        project_context: Optional[ProjectContext]
-    ) -> str:
-        """Generate high-level file purpose description."""
-        # Simplified version - you can reuse existing analyzer logic
-        return f"Code file at {file_path.name}"
+    def _generate_file_purpose(self, call_graph, file_path: Path) -> str:
+        """
+        Derive a file purpose from the call graph, without an LLM call.
+
+        Per-file LLM purposes would double the round trips of a pass;
+        the exported symbols already say what the module offers.
+        """
+        if not call_graph.exports:
+            return f"Module {file_path.stem}"
+        return f"Module {file_path.stem}: exports {', '.join(call_graph.exports[:5])}"
 
     async def _llm_only_analysis(
         self,
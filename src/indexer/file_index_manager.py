@@ -1,26 +1,40 @@
 """File Index Manager (Index 2) - Indexes files using project analysis."""
 
 import asyncio
-import hashlib
+import os
 import time
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from ..config import Config
 from ..providers.base import EmbeddingProvider, LLMProvider
 from ..storage.analysis_repository import AnalysisRepository
 from ..storage.checkpoint_manager import CheckpointManager
-from ..storage.chroma_client import ChromaManager
-from ..storage.models import IndexedDocument, ProjectContext
+from ..storage.chroma_client import ChromaManager, project_path_hash
+from ..storage.embedding_cache import EmbeddingCache
+from ..storage.response_cache import ResponseCache
+from ..storage.models import DocumentBatch, IndexedDocument, ProjectContext
+from ..utils.content_hash import content_hash, file_content_hash
 from ..utils.logger import get_logger
 from ..utils.rate_limiter import RateLimiter
+from ..utils.text import decode_text
 from .analyzer import analyze_code
 from .chunker import chunk_code_file
-from .embedder import prepare_embedding_text
-from .scanner import scan_project
+from .embedder import create_embeddings_cached, prepare_embedding_text
+from .scanner import compile_patterns, scan_project
 
 logger = get_logger(__name__)
 
+# Files above this size are hashed by streaming instead of being read whole
+LARGE_FILE_HASH_BYTES = 8 * 1024 * 1024
+
+# Indexed chunks are written to ChromaDB whenever this many are pending,
+# so memory holds O(batch) embeddings instead of the whole project
+DOCUMENT_FLUSH_SIZE = 1000
+
 
 class FileIndexManager:
     """
@@ -40,7 +54,9 @@ class FileIndexManager:
         embedding_provider: EmbeddingProvider,
         rate_limiter: RateLimiter,
         checkpoint_manager: CheckpointManager,
-        analysis_repository: AnalysisRepository
+        analysis_repository: AnalysisRepository,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        response_cache: Optional[ResponseCache] = None
     ):
         """
         Initialize file index manager.
@@ -53,6 +69,10 @@ class FileIndexManager:
             rate_limiter: Rate limiter for API calls
             checkpoint_manager: Unified checkpoint manager
             analysis_repository: Repository for Index 1 data
+            embedding_cache: Optional persistent embedding cache, so unchanged
+                texts are not re-embedded across runs or force reindexes
+            response_cache: Optional cache of LLM responses by exact prompt,
+                so unchanged chunks are not re-analyzed
         """
         self.config = config
         self.chroma = chroma
@@ -61,6 +81,8 @@ class FileIndexManager:
         self.rate_limiter = rate_limiter
         self.checkpoint_manager = checkpoint_manager
         self.analysis_repo = analysis_repository
+        self.embedding_cache = embedding_cache
+        self.response_cache = response_cache
 
     async def index_files(
         self,
@@ -145,95 +167,121 @@ class FileIndexManager:
 
             logger.info(f"Scanning with patterns: include={include_patterns[:3]}...")
 
+            # Reuse stored hashes for files whose size and mtime have not changed
+            fingerprints = self.checkpoint_manager.get_file_fingerprints(project_str)
+
+            # Compiled specs are cached, so repeated runs skip pattern parsing
             file_metadatas = await scan_project(
                 project_path,
-                include_patterns,
-                exclude_pats,
-                max_file_size_mb=self.config.indexing.max_file_size_mb
+                compile_patterns(tuple(include_patterns)),
+                compile_patterns(tuple(exclude_pats)),
+                max_file_size_mb=self.config.indexing.max_file_size_mb,
+                known_files=fingerprints
             )
 
             stats["total_files"] = len(file_metadatas)
             logger.info(f"Found {stats['total_files']} files")
 
-            # Step 5: Filter by checkpoints
+            # Step 5: Filter by checkpoints (one query; failed and new files
+            # are absent from the map, so they are reindexed)
+            indexed_hashes = self.checkpoint_manager.get_indexed_hashes(project_str)
             files_to_process = []
+            touched_files = {}
             for file_meta in file_metadatas:
                 rel_path = str(file_meta.relative_path)
-                if self.checkpoint_manager.should_reindex_file(project_str, rel_path, file_meta.hash):
+                if indexed_hashes.get(rel_path) != file_meta.hash:
                     files_to_process.append(file_meta)
                 else:
                     stats["skipped_files"] += 1
+                    fingerprint = (file_meta.file_size, file_meta.last_modified)
+                    known = fingerprints.get(rel_path)
+                    if known is None or known[:2] != fingerprint:
+                        touched_files[rel_path] = fingerprint
+
+            # Same content, new mtime: remember it so the next scan skips hashing
+            self.checkpoint_manager.update_file_fingerprints(project_str, touched_files)
 
             logger.info(f"Processing {len(files_to_process)} files (skipped {stats['skipped_files']} already indexed)")
 
-            # Step 6: Process files
-            sem = asyncio.Semaphore(self.config.indexing.max_concurrent_files)
-            processed_count = 0
-            progress_lock = asyncio.Lock()
-            indexed_docs = []
+            # Step 6: Process files with a fixed pool of workers pulling from a queue,
+            # so one slow file never holds back a whole batch
+            queue: asyncio.Queue = asyncio.Queue()
+            for file_meta in files_to_process:
+                queue.put_nowait(file_meta)
 
-            async def process_file(file_meta):
-                nonlocal processed_count
-                async with sem:
-                    try:
-                        async with progress_lock:
-                            processed_count += 1
-                            current = processed_count
-                        logger.info(f"[{current}/{len(files_to_process)}] Processing: {file_meta.relative_path}")
-
-                        docs = await self._process_file(file_meta, project_path, project_context)
-
-                        # Mark completed
-                        self.checkpoint_manager.mark_file_indexed(
-                            project_str,
-                            str(file_meta.relative_path),
-                            file_meta.hash,
-                            chunks_count=len(docs)
-                        )
+            num_workers = min(self.config.indexing.max_concurrent_files, len(files_to_process))
+            for _ in range(num_workers):
+                queue.put_nowait(None)  # One stop sentinel per worker
 
-                        return docs, None
-                    except Exception as e:
-                        logger.error(f"Failed: {file_meta.relative_path} - {e}")
-
-                        self.checkpoint_manager.mark_file_indexed(
-                            project_str,
-                            str(file_meta.relative_path),
-                            file_meta.hash,
-                            error=str(e)
-                        )
+            processed_count = 0
+            pending_docs = DocumentBatch()
 
-                        return [], str(e)
+            # Checkpoint rows go to one background writer that commits them in
+            # batches, so workers never wait on SQLite
+            checkpoint_queue: asyncio.Queue = asyncio.Queue()
+            checkpoint_writer = asyncio.create_task(
+                self._write_checkpoints(project_str, checkpoint_queue)
+            )
 
-            # Process in chunks
-            CHUNK_SIZE = 50
-            for chunk_start in range(0, len(files_to_process), CHUNK_SIZE):
-                chunk_end = min(chunk_start + CHUNK_SIZE, len(files_to_process))
-                chunk_files = files_to_process[chunk_start:chunk_end]
+            async def process_file(file_meta):
+                nonlocal processed_count
+                try:
+                    processed_count += 1
+                    logger.info(f"[{processed_count}/{len(files_to_process)}] Processing: {file_meta.relative_path}")
 
-                logger.info(f"Processing files {chunk_start + 1}-{chunk_end}/{len(files_to_process)}")
+                    docs = await self._process_file(file_meta, project_path, project_context)
 
-                tasks = [process_file(fm) for fm in chunk_files]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+                    # Mark completed
+                    checkpoint_queue.put_nowait({
+                        "file_path": str(file_meta.relative_path),
+                        "file_hash": file_meta.hash,
+                        "chunks_count": len(docs),
+                        "file_size": file_meta.file_size,
+                        "file_mtime": file_meta.last_modified
+                    })
 
-                for result in results:
-                    if isinstance(result, Exception):
-                        errors.append({"error": str(result)})
+                    return docs, None
+                except Exception as e:
+                    logger.error(f"Failed: {file_meta.relative_path} - {e}")
+
+                    checkpoint_queue.put_nowait({
+                        "file_path": str(file_meta.relative_path),
+                        "file_hash": file_meta.hash,
+                        "error": str(e)
+                    })
+
+                    return DocumentBatch(), str(e)
+
+            async def worker():
+                nonlocal pending_docs
+                while (file_meta := await queue.get()) is not None:
+                    docs, error = await process_file(file_meta)
+                    if docs:
+                        pending_docs.extend(docs)
+                        stats["indexed_files"] += 1
+                        stats["total_chunks"] += len(docs)
+                    if error:
                         stats["failed_files"] += 1
-                    else:
-                        docs, error = result
-                        if docs:
-                            indexed_docs.extend(docs)
-                            stats["indexed_files"] += 1
-                            stats["total_chunks"] += len(docs)
-                        if error:
-                            stats["failed_files"] += 1
-                            errors.append({"error": error})
-
-            # Step 7: Store documents
-            if indexed_docs:
-                logger.info(f"Storing {len(indexed_docs)} chunks in ChromaDB...")
-                await self.chroma.add_documents(collection, indexed_docs)
-                logger.info("All chunks stored")
+                        errors.append({"error": error})
+
+                    # Step 7: Store documents as they accumulate; take the
+                    # batch before awaiting so other workers keep filling
+                    if len(pending_docs) >= DOCUMENT_FLUSH_SIZE:
+                        batch, pending_docs = pending_docs, DocumentBatch()
+                        logger.info(f"Storing {len(batch)} chunks in ChromaDB...")
+                        await self.chroma.add_document_batch(collection, batch)
+
+            try:
+                await asyncio.gather(*(worker() for _ in range(num_workers)))
+            finally:
+                # Flush the remaining checkpoint rows before returning
+                checkpoint_queue.put_nowait(None)
+                await checkpoint_writer
+
+            if pending_docs:
+                logger.info(f"Storing {len(pending_docs)} chunks in ChromaDB...")
+                await self.chroma.add_document_batch(collection, pending_docs)
+            logger.info("All chunks stored")
 
             stats["duration_seconds"] = time.time() - start_time
 
@@ -259,15 +307,30 @@ class FileIndexManager:
         self,
         file_meta,
         project_path: Path,
-        project_context: ProjectContext
-    ) -> List[IndexedDocument]:
-        """Process a single file through the indexing pipeline."""
+        project_context: ProjectContext,
+        content: Optional[str] = None
+    ) -> DocumentBatch:
+        """
+        Process a single file through the indexing pipeline.
+
+        Args:
+            file_meta: FileMetadata object.
+            project_path: Project root path.
+            project_context: Project context.
+            content: File content if the caller already read it (read from
+                disk otherwise).
+
+        Returns:
+            DocumentBatch with one document per chunk.
+        """
         # Read file
-        try:
-            content = file_meta.file_path.read_text(encoding='utf-8', errors='ignore')
-        except Exception as e:
-            logger.warning(f"Failed to read {file_meta.relative_path}: {e}")
-            raise
+        if content is None:
+            try:
+                raw = await asyncio.to_thread(file_meta.file_path.read_bytes)
+                content = decode_text(raw)
+            except Exception as e:
+                logger.warning(f"Failed to read {file_meta.relative_path}: {e}")
+                raise
 
         # Chunk if necessary
         chunks = await chunk_code_file(
@@ -278,76 +341,132 @@ class FileIndexManager:
             overlap_tokens=self.config.indexing.chunk_overlap_tokens
         )
 
-        indexed_docs = []
-
-        for i, chunk in enumerate(chunks, 1):
-            chunk_info = f" [{i}/{len(chunks)}]" if len(chunks) > 1 else ""
-
-            # Analyze with LLM
-            await self.rate_limiter.acquire(tokens=1000, request_count=1)
-
-            analysis = await self.rate_limiter.execute_with_retry(
-                lambda: analyze_code(
-                    chunk.content,
-                    file_meta.file_path,
-                    file_meta.language,
-                    file_meta.file_type,
-                    project_context,
-                    self.llm_provider
+        # Analyze all chunks concurrently (each LLM request rate limited;
+        # cached responses skip the limiter)
+        sem = asyncio.Semaphore(self.config.indexing.max_concurrent_llm_batches)
+
+        async def analyze_chunk(i, chunk):
+            async with sem:
+                analysis = await self.rate_limiter.execute_with_retry(
+                    partial(
+                        analyze_code,
+                        chunk.content,
+                        file_meta.file_path,
+                        file_meta.language,
+                        file_meta.file_type,
+                        project_context,
+                        self.llm_provider,
+                        response_cache=self.response_cache,
+                        rate_limiter=self.rate_limiter
+                    )
                 )
-            )
 
-            logger.info(f"  Analyzed{chunk_info}")
+            # Per-chunk progress is DEBUG with deferred formatting: it runs once
+            # per chunk and is usually filtered out
+            logger.debug("  Analyzed [%d/%d]", i, len(chunks))
+            return analysis
 
-            # Prepare embedding text
-            embedding_text = prepare_embedding_text(
+        analyses = await asyncio.gather(
+            *(analyze_chunk(i, chunk) for i, chunk in enumerate(chunks, 1))
+        )
+
+        # Embed every chunk of the file in one batched request
+        embedding_texts = [
+            prepare_embedding_text(
                 chunk.content,
                 file_meta.relative_path,
                 analysis,
                 project_context
             )
+            for chunk, analysis in zip(chunks, analyses)
+        ]
+
+        embedding_vectors = await self._embed_texts(embedding_texts)
+
+        logger.debug("  Embedded %d chunk(s)", len(embedding_vectors))
+
+        indexed_docs = DocumentBatch()
+
+        # Fields shared by every chunk of the file, built once per file
+        file_metadata = {
+            "file_path": str(file_meta.file_path),
+            "relative_path": str(file_meta.relative_path),
+            "language": file_meta.language,
+            "file_type": file_meta.file_type,
+            "last_modified": file_meta.last_modified,
+            "file_size": file_meta.file_size,
+            "indexed_at": time.time(),
+            "project_root": str(project_path),
+            "hash": file_meta.hash,
+            "index_type": "files"  # Mark as Index 2
+        }
 
-            # Generate embedding
-            await self.rate_limiter.acquire(tokens=500, request_count=1)
-
-            embedding_vector = await self.rate_limiter.execute_with_retry(
-                lambda: self.embedding_provider.create_embedding(embedding_text)
-            )
-
-            logger.info(f"  Embedded{chunk_info}")
-
+        for chunk, analysis, embedding_vector in zip(chunks, analyses, embedding_vectors):
             # Create document
             doc_id = self._generate_document_id(project_path, file_meta.relative_path, chunk.chunk_index)
 
             metadata = {
-                "file_path": str(file_meta.file_path),
-                "relative_path": str(file_meta.relative_path),
+                **file_metadata,
                 "chunk_index": chunk.chunk_index,
                 "total_chunks": chunk.total_chunks,
-                "language": file_meta.language,
-                "file_type": file_meta.file_type,
-                "last_modified": file_meta.last_modified,
-                "file_size": file_meta.file_size,
-                "dependencies": ", ".join(analysis.dependencies) if analysis.dependencies else "",
-                "exported_symbols": ", ".join(analysis.exported_symbols) if analysis.exported_symbols else "",
-                "purpose": analysis.purpose,
-                "indexed_at": time.time(),
-                "project_root": str(project_path),
-                "hash": file_meta.hash,
-                "index_type": "files"  # Mark as Index 2
+                "dependencies": ", ".join(analysis.dependencies),
+                "exported_symbols": ", ".join(analysis.exported_symbols),
+                "purpose": analysis.purpose
             }
 
-            doc = IndexedDocument(
-                id=doc_id,
-                content=chunk.content,
-                embedding=embedding_vector,
-                metadata=metadata
-            )
-
-            indexed_docs.append(doc)
+            indexed_docs.append(doc_id, chunk.content, embedding_vector, metadata)
 
         return indexed_docs
 
+    async def _write_checkpoints(self, project_str: str, queue: asyncio.Queue):
+        """
+        Write queued file checkpoints until a None sentinel arrives.
+
+        Everything queued since the last write goes out in one
+        executemany/commit on a worker thread.
+
+        Args:
+            project_str: Project root path string.
+            queue: Queue of mark_file_indexed keyword dicts, ended by None.
+        """
+        done = False
+        while not done:
+            records = [await queue.get()]
+            while not queue.empty():
+                records.append(queue.get_nowait())
+            if records[-1] is None:
+                records.pop()
+                done = True
+
+            if records:
+                try:
+                    await asyncio.to_thread(
+                        self.checkpoint_manager.mark_files_indexed, project_str, records
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to write {len(records)} checkpoint(s): {e}")
+
+    async def _embed_texts(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed texts, sending each distinct uncached text to the provider once.
+
+        Byte-identical texts within the call share one request entry; reuse
+        across files and runs comes from the persistent embedding cache (if
+        configured).
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embeddings in the same order as texts
+        """
+        return await create_embeddings_cached(
+            texts,
+            self.embedding_provider,
+            cache=self.embedding_cache,
+            rate_limiter=self.rate_limiter
+        )
+
     async def _store_project_context(
         self,
         collection,
@@ -396,8 +515,7 @@ Purpose: {context.purpose}
 
     def _generate_document_id(self, project_path: Path, relative_path: Path, chunk_index: int) -> str:
         """Generate document ID for file index."""
-        project_hash = hashlib.sha256(str(project_path.resolve()).encode()).hexdigest()[:12]
-        return f"files:{project_hash}:{relative_path}:{chunk_index}"
+        return f"files:{project_path_hash(str(project_path))}:{relative_path}:{chunk_index}"
 
     async def search_files(
         self,
@@ -530,54 +648,86 @@ Purpose: {context.purpose}
             from .scanner import detect_language, classify_file_type
             from ..storage.models import FileMetadata
 
-            indexed_docs = []
+            fingerprints = self.checkpoint_manager.get_file_fingerprints(project_str)
+            sem = asyncio.Semaphore(self.config.indexing.max_concurrent_files)
 
-            for file_path_str in file_paths:
+            checkpoint_queue: asyncio.Queue = asyncio.Queue()
+            checkpoint_writer = asyncio.create_task(
+                self._write_checkpoints(project_str, checkpoint_queue)
+            )
+
+            async def update_file(file_path_str):
                 file_path = project_path / file_path_str
 
                 if not file_path.exists():
-                    errors.append({"file": file_path_str, "error": "File not found"})
-                    stats["failed_files"] += 1
-                    continue
+                    return file_path_str, DocumentBatch(), "File not found"
 
-                try:
-                    content = file_path.read_bytes()
-                    file_hash = hashlib.sha256(content).hexdigest()
-
-                    file_meta = FileMetadata(
-                        file_path=file_path,
-                        relative_path=Path(file_path_str),
-                        language=detect_language(file_path),
-                        file_type=classify_file_type(file_path),
-                        file_size=file_path.stat().st_size,
-                        last_modified=file_path.stat().st_mtime,
-                        hash=file_hash
-                    )
+                async with sem:
+                    try:
+                        # stat/hash/read block on I/O: keep them off the event loop
+                        stat, file_hash, content = await asyncio.to_thread(
+                            self._load_for_update, file_path, fingerprints.get(file_path_str)
+                        )
 
-                    logger.info(f"Processing: {file_path_str}")
-                    docs = await self._process_file(file_meta, project_path, project_context)
-                    indexed_docs.extend(docs)
-
-                    # Update checkpoint
-                    self.checkpoint_manager.mark_file_indexed(
-                        project_str,
-                        file_path_str,
-                        file_hash,
-                        chunks_count=len(docs)
-                    )
+                        file_meta = FileMetadata(
+                            file_path=file_path,
+                            relative_path=Path(file_path_str),
+                            language=detect_language(file_path),
+                            file_type=classify_file_type(file_path),
+                            file_size=stat.st_size,
+                            last_modified=stat.st_mtime,
+                            hash=file_hash
+                        )
+
+                        logger.info(f"Processing: {file_path_str}")
+                        # Reuse the bytes read for hashing instead of reopening the file
+                        docs = await self._process_file(
+                            file_meta,
+                            project_path,
+                            project_context,
+                            content=content
+                        )
+
+                        # Update checkpoint
+                        checkpoint_queue.put_nowait({
+                            "file_path": file_path_str,
+                            "file_hash": file_hash,
+                            "chunks_count": len(docs),
+                            "file_size": stat.st_size,
+                            "file_mtime": stat.st_mtime
+                        })
+
+                        return file_path_str, docs, None
 
+                    except Exception as e:
+                        logger.error(f"Failed to process {file_path_str}: {e}")
+                        return file_path_str, DocumentBatch(), str(e)
+
+            # Consume files as they finish, so stores start before the slowest file is done
+            pending_docs = DocumentBatch()
+            try:
+                for next_done in asyncio.as_completed([update_file(fp) for fp in file_paths]):
+                    file_path_str, docs, error = await next_done
+                    if error:
+                        errors.append({"file": file_path_str, "error": error})
+                        stats["failed_files"] += 1
+                        continue
+
+                    pending_docs.extend(docs)
                     stats["updated_files"] += 1
                     stats["total_chunks"] += len(docs)
 
-                except Exception as e:
-                    logger.error(f"Failed to process {file_path_str}: {e}")
-                    errors.append({"file": file_path_str, "error": str(e)})
-                    stats["failed_files"] += 1
+                    if len(pending_docs) >= DOCUMENT_FLUSH_SIZE:
+                        await self.chroma.add_document_batch(collection, pending_docs)
+                        pending_docs = DocumentBatch()
+            finally:
+                checkpoint_queue.put_nowait(None)
+                await checkpoint_writer
 
-            # Store updated documents
-            if indexed_docs:
-                await self.chroma.add_documents(collection, indexed_docs)
-                logger.info(f"Updated {stats['updated_files']} files ({stats['total_chunks']} chunks)")
+            # Store remaining updated documents
+            if pending_docs:
+                await self.chroma.add_document_batch(collection, pending_docs)
+            logger.info(f"Updated {stats['updated_files']} files ({stats['total_chunks']} chunks)")
 
             return {
                 "status": "success" if stats["failed_files"] == 0 else "partial",
@@ -589,6 +739,34 @@ Purpose: {context.purpose}
             logger.error(f"Update files failed: {e}")
             return {"status": "failed", "error": str(e), "stats": stats}
 
+    @staticmethod
+    def _load_for_update(
+        file_path: Path,
+        known: Optional[Tuple[int, float, str]]
+    ) -> Tuple[os.stat_result, str, Optional[str]]:
+        """
+        Stat and hash a file for update_files, reading its content when cheap.
+
+        Args:
+            file_path: Absolute file path
+            known: Stored (size, mtime, hash) fingerprint, if any
+
+        Returns:
+            Tuple of (stat, file_hash, content or None if not read)
+        """
+        stat = file_path.stat()
+        if known and known[:2] == (stat.st_size, stat.st_mtime):
+            # Unchanged since last indexed: trust the stored hash
+            return stat, known[2], None
+
+        if stat.st_size > LARGE_FILE_HASH_BYTES:
+            # Stream into the hash; _process_file reads the content itself
+            with open(file_path, 'rb') as f:
+                return stat, file_content_hash(f), None
+
+        raw = file_path.read_bytes()
+        return stat, content_hash(raw), decode_text(raw)
+
     async def remove_files(
         self,
         project_path: Path,
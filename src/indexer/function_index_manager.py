@@ -2,24 +2,108 @@
 
 import asyncio
 import hashlib
-import json
 import time
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..config import Config
 from ..providers.base import ChatMessage, EmbeddingProvider, LLMProvider
 from ..storage.analysis_repository import AnalysisRepository
 from ..storage.checkpoint_manager import CheckpointManager
-from ..storage.chroma_client import ChromaManager
+from ..storage.chroma_client import ChromaManager, project_path_hash
 from ..storage.models import AnalyzedFunction, ExtractedFunction, IndexedDocument
+from ..utils import fast_json
 from ..utils.logger import get_logger
 from ..utils.rate_limiter import RateLimiter
+from ..utils.text import normalize_newlines
+from .analyzers import get_analyzer
+from .analyzers.base import BaseLanguageAnalyzer
 from .ast_analyzer import ASTAnalyzer
-from .scanner import scan_project
+from .scanner import compile_patterns, scan_project
 
 logger = get_logger(__name__)
 
+# Boilerplate that gets a generated description instead of an LLM call
+TRIVIAL_FUNCTION_NAMES = frozenset({
+    '__init__', '__repr__', '__str__', '__eq__', '__hash__',
+    'setUp', 'tearDown'
+})
+
+# Functions shorter than indexing.llm_analysis_min_lines are trivial if their
+# code is also under this many characters (getters, delegators, one-liners)
+TRIVIAL_MAX_CHARS = 200
+
+# The embedding batcher sends a partial batch once no analyzed file has
+# arrived for this long
+EMBED_FLUSH_IDLE_SECONDS = 0.1
+
+# Code files scanned for functions unless file_patterns are given
+FUNCTION_FILE_EXTENSIONS = frozenset({
+    ".py", ".js", ".ts", ".tsx", ".jsx", ".java", ".kt", ".go", ".rs", ".rb",
+    ".c", ".cpp", ".h", ".hpp"
+})
+
+# Metadata fields returned for each search_functions hit
+SEARCH_RESULT_KEYS = (
+    "function_name", "relative_path", "line_start", "line_end", "class_name",
+    "is_method", "is_async", "language", "description", "purpose", "complexity"
+)
+
+# Function-analysis prompt; {header} is the project part, built once per run
+FUNCTION_PROMPT_HEADER_TEMPLATE = """Analyze this function from a {name} project.
+
+PROJECT CONTEXT:
+- Name: {name}
+- Tech Stack: {tech_stack}
+- Frameworks: {frameworks}
+- Purpose: {purpose}
+"""
+
+FUNCTION_PROMPT_TEMPLATE = """{header}
+FILE: {file}
+LANGUAGE: {language}
+
+FUNCTION:
+```{language}
+{code}
+```
+
+{docstring}
+{class_name}
+{decorators}
+
+Analyze and return JSON:
+{{
+  "description": "Brief description of what this function does (1-2 sentences)",
+  "purpose": "Why does this function exist in the project context?",
+  "input_description": "What are the inputs and their expected types/formats?",
+  "output_description": "What is returned and when?",
+  "side_effects": ["list of side effects like database writes, API calls, etc."],
+  "complexity": "low|medium|high (based on logic complexity)"
+}}
+"""
+
+# Structured-output schema for function analysis
+FUNCTION_ANALYSIS_SCHEMA = {
+    "name": "function_analysis",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "description": {"type": "string"},
+            "purpose": {"type": "string"},
+            "input_description": {"type": "string"},
+            "output_description": {"type": "string"},
+            "side_effects": {"type": "array", "items": {"type": "string"}},
+            "complexity": {"type": "string", "enum": ["low", "medium", "high"]}
+        },
+        "required": ["description", "purpose", "input_description",
+                     "output_description", "side_effects", "complexity"],
+        "additionalProperties": False
+    }
+}
+
 
 class FunctionIndexManager:
     """
@@ -65,6 +149,8 @@ class FunctionIndexManager:
         self.checkpoint_manager = checkpoint_manager
         self.analysis_repo = analysis_repository
         self.ast_analyzer = ASTAnalyzer()
+        # Analyzers are stateless: one per language for all files
+        self._analyzers: Dict[str, BaseLanguageAnalyzer] = {}
 
     async def index_functions(
         self,
@@ -120,6 +206,9 @@ class FunctionIndexManager:
         project_context = analysis.to_project_context()
         logger.info(f"Using project analysis: {analysis.min_confidence()}% confidence")
 
+        # The project part of the prompt is the same for every function
+        prompt_header = self._build_prompt_header(project_context)
+
         # Step 2: Handle force_reindex
         checkpoint_stats = self.checkpoint_manager.get_function_index_stats(project_str)
         is_resume = checkpoint_stats['completed'] > 0
@@ -146,21 +235,18 @@ class FunctionIndexManager:
             # Step 3: Get or create collection
             collection = self.chroma.get_or_create_collection(project_path, collection_type='functions')
 
-            # Step 4: Scan files (only code files)
-            include_patterns = file_patterns if file_patterns else [
-                "**/*.py", "**/*.js", "**/*.ts", "**/*.tsx", "**/*.jsx",
-                "**/*.java", "**/*.kt", "**/*.go", "**/*.rs", "**/*.rb",
-                "**/*.c", "**/*.cpp", "**/*.h", "**/*.hpp"
-            ]
+            # Step 4: Scan files (only code files); the default set is
+            # matched by extension, custom patterns as globs
             exclude_pats = list(self.config.patterns.exclude)
             if exclude_patterns:
                 exclude_pats.extend(exclude_patterns)
 
             file_metadatas = await scan_project(
                 project_path,
-                include_patterns,
-                exclude_pats,
-                max_file_size_mb=self.config.indexing.max_file_size_mb
+                compile_patterns(tuple(file_patterns or ())),
+                compile_patterns(tuple(exclude_pats)),
+                max_file_size_mb=self.config.indexing.max_file_size_mb,
+                include_extensions=None if file_patterns else FUNCTION_FILE_EXTENSIONS
             )
 
             # Filter to only code files
@@ -179,76 +265,123 @@ class FunctionIndexManager:
 
             logger.info(f"Processing {len(files_to_process)} files (skipped {stats['skipped_files']})")
 
-            # Step 6: Process files
-            sem = asyncio.Semaphore(self.config.indexing.max_concurrent_files)
-            all_docs = []
+            # Files indexed before whose old function documents must go:
+            # IDs depend on line numbers, so upserts alone leave stale entries
+            previously_indexed = self.checkpoint_manager.get_function_completed_files(project_str)
+
+            # Step 6: Process files as a pipeline: workers extract and analyze
+            # files while one batcher embeds and stores finished files in
+            # cross-file batches, so neither side waits for a whole wave to
+            # finish and memory holds only the batch in flight
+
+            file_queue: asyncio.Queue = asyncio.Queue()
+            for file_meta in files_to_process:
+                file_queue.put_nowait(file_meta)
+
+            num_workers = min(self.config.indexing.max_concurrent_files, len(files_to_process))
+            for _ in range(num_workers):
+                file_queue.put_nowait(None)  # One stop sentinel per worker
+
+            # Bounded, so analysis pauses if embedding falls behind
+            embed_queue: asyncio.Queue = asyncio.Queue(maxsize=max(num_workers, 1) * 2)
+            batch_size = self.config.indexing.embedding_batch_size
 
             async def process_file(file_meta):
-                async with sem:
-                    try:
-                        logger.info(f"Processing: {file_meta.relative_path}")
+                try:
+                    logger.info(f"Processing: {file_meta.relative_path}")
 
-                        docs, func_count = await self._process_file(
-                            file_meta, project_path, project_context
-                        )
+                    pending, func_count = await self._process_file(
+                        file_meta, project_path, project_context, prompt_header
+                    )
+                    return file_meta, pending, func_count, None
 
-                        # Mark completed
-                        self.checkpoint_manager.mark_functions_indexed(
-                            project_str,
-                            str(file_meta.relative_path),
-                            file_meta.hash,
-                            functions_count=func_count
-                        )
+                except Exception as e:
+                    logger.error(f"Failed: {file_meta.relative_path} - {e}")
+                    return file_meta, [], 0, str(e)
 
-                        return docs, func_count, None
+            async def worker():
+                while (file_meta := await file_queue.get()) is not None:
+                    await embed_queue.put(await process_file(file_meta))
 
-                    except Exception as e:
-                        logger.error(f"Failed: {file_meta.relative_path} - {e}")
+            def record(file_meta, func_count, error):
+                """Update stats and return the file's checkpoint record."""
+                if error:
+                    stats["failed_files"] += 1
+                    errors.append({"error": error})
+                else:
+                    stats["processed_files"] += 1
+                    stats["total_functions"] += func_count
+                return {
+                    "file_path": str(file_meta.relative_path),
+                    "file_hash": file_meta.hash,
+                    "functions_count": func_count,
+                    "error": error
+                }
 
-                        self.checkpoint_manager.mark_functions_indexed(
-                            project_str,
-                            str(file_meta.relative_path),
-                            file_meta.hash,
-                            error=str(e)
+            def checkpoint(records):
+                # One transaction per batch instead of a commit per file
+                self.checkpoint_manager.mark_function_files_indexed(project_str, records)
+
+            async def flush(group):
+                pending = [item for _, items, _ in group for item in items]
+                replaced_files = [
+                    str(file_meta.relative_path) for file_meta, _, _ in group
+                    if str(file_meta.relative_path) in previously_indexed
+                ]
+                try:
+                    docs = await self._embed_documents(pending)
+                    if replaced_files:
+                        await self.chroma.delete_files_by_path(collection, project_path, replaced_files)
+                    if docs:
+                        # add_documents upserts in bounded windows
+                        await self.chroma.add_documents(collection, docs)
+                except Exception as e:
+                    logger.error(f"Embedding/storing failed for {len(group)} files: {e}")
+                    checkpoint([record(file_meta, 0, str(e)) for file_meta, _, _ in group])
+                    return
+
+                stats["analyzed_functions"] += len(docs)
+                # Checkpoint only after storing, so a failed batch is retried
+                checkpoint([record(file_meta, func_count, None) for file_meta, _, func_count in group])
+
+            async def batcher():
+                group = []
+                pending_count = 0
+                while True:
+                    try:
+                        # With work pending, flush once no file arrives for a moment
+                        result = await asyncio.wait_for(
+                            embed_queue.get(),
+                            EMBED_FLUSH_IDLE_SECONDS if group else None
                         )
+                    except asyncio.TimeoutError:
+                        await flush(group)
+                        group, pending_count = [], 0
+                        continue
 
-                        return [], 0, str(e)
+                    if result is None:
+                        break
 
-            # Process in chunks
-            CHUNK_SIZE = 20
-            for chunk_start in range(0, len(files_to_process), CHUNK_SIZE):
-                chunk_end = min(chunk_start + CHUNK_SIZE, len(files_to_process))
-                chunk_files = files_to_process[chunk_start:chunk_end]
+                    file_meta, pending, func_count, error = result
+                    if error:
+                        checkpoint([record(file_meta, 0, error)])
+                        continue
 
-                logger.info(f"Processing files {chunk_start + 1}-{chunk_end}/{len(files_to_process)}")
+                    group.append((file_meta, pending, func_count))
+                    pending_count += len(pending)
+                    if pending_count >= batch_size:
+                        await flush(group)
+                        group, pending_count = [], 0
 
-                tasks = [process_file(fm) for fm in chunk_files]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+                if group:
+                    await flush(group)
 
-                for result in results:
-                    if isinstance(result, Exception):
-                        errors.append({"error": str(result)})
-                        stats["failed_files"] += 1
-                    else:
-                        docs, func_count, error = result
-                        if error:
-                            stats["failed_files"] += 1
-                            errors.append({"error": error})
-                        else:
-                            all_docs.extend(docs)
-                            stats["processed_files"] += 1
-                            stats["total_functions"] += func_count
-
-            # Step 7: Store documents
-            if all_docs:
-                logger.info(f"Storing {len(all_docs)} function documents in ChromaDB...")
-                # Store in batches
-                BATCH_SIZE = 100
-                for i in range(0, len(all_docs), BATCH_SIZE):
-                    batch = all_docs[i:i + BATCH_SIZE]
-                    await self.chroma.add_documents(collection, batch)
-                logger.info("All function documents stored")
-                stats["analyzed_functions"] = len(all_docs)
+            async def produce():
+                await asyncio.gather(*(worker() for _ in range(num_workers)))
+                await embed_queue.put(None)
+
+            await asyncio.gather(produce(), batcher())
+            logger.info(f"Stored {stats['analyzed_functions']} function documents in ChromaDB")
 
             stats["duration_seconds"] = time.time() - start_time
 
@@ -274,23 +407,31 @@ class FunctionIndexManager:
         self,
         file_meta,
         project_path: Path,
-        project_context
-    ) -> tuple[List[IndexedDocument], int]:
-        """Process a single file: extract functions and analyze with LLM."""
+        project_context,
+        prompt_header: Optional[str] = None
+    ) -> Tuple[List[Tuple[IndexedDocument, str]], int]:
+        """
+        Process a single file: extract functions and analyze with LLM.
 
-        # Read file content
-        try:
-            content = file_meta.file_path.read_text(encoding='utf-8', errors='ignore')
-        except Exception as e:
-            logger.warning(f"Failed to read {file_meta.relative_path}: {e}")
-            raise
+        Embeddings are not generated here: each document is returned with
+        its embedding text for _embed_documents to batch across files.
 
-        # Extract functions via AST
-        extracted_functions = self._extract_functions(
-            content,
-            file_meta.language,
-            file_meta.file_path
-        )
+        Args:
+            file_meta: FileMetadata object
+            project_path: Project root path
+            project_context: Project context
+            prompt_header: Prompt header from _build_prompt_header (built
+                from project_context if not given)
+
+        Returns:
+            ([(document without embedding, embedding text)], function count)
+        """
+        if prompt_header is None:
+            prompt_header = self._build_prompt_header(project_context)
+
+        # Reading and parsing block: run them on a worker thread so the loop
+        # keeps serving other files' LLM and embedding requests
+        extracted_functions = await asyncio.to_thread(self._read_and_extract, file_meta)
 
         if not extracted_functions:
             logger.debug(f"No functions found in {file_meta.relative_path}")
@@ -302,92 +443,194 @@ class FunctionIndexManager:
         max_concurrent = self.config.indexing.max_concurrent_functions
         sem = asyncio.Semaphore(max_concurrent)
 
-        async def analyze_single_function(func, index):
+        # Metadata shared by every function of the file, built once
+        file_metadata = {
+            "relative_path": str(file_meta.relative_path),
+            "language": file_meta.language,
+            "indexed_at": time.time(),
+            "project_root": str(project_path),
+            "index_type": "functions"
+        }
+
+        # Identical code in the same project context gets the same analysis
+        # (duplicates, boilerplate, reindexing): look the file's functions up
+        # by content at once, so cached ones skip the rate limiter and LLM
+        code_hashes = [
+            None if self._is_trivial(func) else self._analysis_key(func, file_meta.language, prompt_header)
+            for func in extracted_functions
+        ]
+        cached_analyses = await asyncio.to_thread(
+            self.analysis_repo.get_function_analyses,
+            [code_hash for code_hash in code_hashes if code_hash]
+        )
+        # Fresh LLM analyses, cached together once the file is done
+        new_analyses: Dict[str, Dict[str, Any]] = {}
+
+        async def analyze_single_function(func, index, code_hash):
             """Analyze a single function with rate limiting."""
-            async with sem:
-                try:
-                    # Analyze function
-                    analysis = await self._analyze_function(func, project_context, file_meta)
-
-                    # Generate embedding
-                    embedding_text = self._prepare_embedding_text(func, analysis, project_context)
-                    await self.rate_limiter.acquire(tokens=500, request_count=1)
-                    embedding = await self.embedding_provider.create_embedding(embedding_text)
-
-                    # Create document
-                    doc_id = self._generate_function_id(project_path, func)
-
-                    metadata = {
-                        "function_name": func.name,
-                        "file_path": func.file_path,
-                        "relative_path": str(file_meta.relative_path),
-                        "line_start": func.line_start,
-                        "line_end": func.line_end,
-                        "parameters": ", ".join(func.parameters),
-                        "return_type": func.return_type or "",
-                        "is_async": func.is_async,
-                        "is_method": func.is_method,
-                        "class_name": func.class_name or "",
-                        "decorators": ", ".join(func.decorators),
-                        "docstring": func.docstring or "",
-                        "language": file_meta.language,
-                        "description": analysis.get("description", ""),
-                        "purpose": analysis.get("purpose", ""),
-                        "input_description": analysis.get("input_description", ""),
-                        "output_description": analysis.get("output_description", ""),
-                        "side_effects": ", ".join(analysis.get("side_effects", [])),
-                        "complexity": analysis.get("complexity", "medium"),
-                        "indexed_at": time.time(),
-                        "project_root": str(project_path),
-                        "index_type": "functions"
-                    }
-
-                    doc = IndexedDocument(
-                        id=doc_id,
-                        content=func.code,
-                        embedding=embedding,
-                        metadata=metadata
-                    )
+            try:
+                # Analyze function (boilerplate and cached code skip the LLM)
+                if code_hash is None:
+                    analysis = self._trivial_analysis(func)
+                elif code_hash in cached_analyses:
+                    analysis = cached_analyses[code_hash]
+                else:
+                    async with sem:
+                        analysis = await self._analyze_function(func, prompt_header, file_meta)
+                    if analysis is None:
+                        analysis = self._fallback_analysis(func)
+                    else:
+                        new_analyses[code_hash] = analysis
+
+                embedding_text = self._prepare_embedding_text(func, analysis, project_context)
+
+                # Create document (embedded later in a cross-file batch)
+                doc_id = self._generate_function_id(project_path, func)
+
+                metadata = {
+                    **file_metadata,
+                    "function_name": func.name,
+                    "file_path": func.file_path,
+                    "line_start": func.line_start,
+                    "line_end": func.line_end,
+                    "parameters": ", ".join(func.parameters),
+                    "return_type": func.return_type or "",
+                    "is_async": func.is_async,
+                    "is_method": func.is_method,
+                    "class_name": func.class_name or "",
+                    "decorators": ", ".join(func.decorators),
+                    "docstring": func.docstring or "",
+                    "description": analysis.get("description", ""),
+                    "purpose": analysis.get("purpose", ""),
+                    "input_description": analysis.get("input_description", ""),
+                    "output_description": analysis.get("output_description", ""),
+                    "side_effects": ", ".join(analysis.get("side_effects", [])),
+                    "complexity": analysis.get("complexity", "medium")
+                }
+
+                doc = IndexedDocument(
+                    id=doc_id,
+                    content=func.code,
+                    embedding=None,
+                    metadata=metadata
+                )
 
-                    if (index + 1) % 10 == 0:
-                        logger.info(f"  Analyzed {index + 1}/{len(extracted_functions)} functions")
+                if (index + 1) % 10 == 0:
+                    logger.info(f"  Analyzed {index + 1}/{len(extracted_functions)} functions")
 
-                    return doc, None
+                return (doc, embedding_text), None
 
-                except Exception as e:
-                    logger.warning(f"  Failed to analyze function {func.name}: {e}")
-                    return None, str(e)
+            except Exception as e:
+                logger.warning(f"  Failed to analyze function {func.name}: {e}")
+                return None, str(e)
 
         # Process all functions in parallel
-        tasks = [analyze_single_function(func, i) for i, func in enumerate(extracted_functions)]
+        tasks = [
+            analyze_single_function(func, i, code_hash)
+            for i, (func, code_hash) in enumerate(zip(extracted_functions, code_hashes))
+        ]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
+        # One transaction per file, off the event loop; the cache is only an
+        # optimization, so a failed write doesn't fail the file
+        if new_analyses:
+            try:
+                await asyncio.to_thread(self.analysis_repo.save_function_analyses, new_analyses)
+            except Exception as e:
+                logger.warning(f"  Failed to cache function analyses: {e}")
+
         # Collect successful documents
-        indexed_docs = []
+        pending = []
         failed_count = 0
         for result in results:
             if isinstance(result, Exception):
                 failed_count += 1
                 logger.warning(f"  Function analysis exception: {result}")
             else:
-                doc, error = result
+                item, error = result
                 if error:
                     failed_count += 1
-                elif doc:
-                    indexed_docs.append(doc)
+                elif item:
+                    pending.append(item)
 
         if failed_count > 0:
             logger.warning(f"  {failed_count}/{len(extracted_functions)} functions failed to analyze")
 
-        return indexed_docs, len(extracted_functions)
+        return pending, len(extracted_functions)
+
+    async def _embed_documents(
+        self,
+        pending: List[Tuple[IndexedDocument, str]]
+    ) -> List[IndexedDocument]:
+        """
+        Embed documents in batches of embedding_batch_size texts.
+
+        Each batch is one embedding request and one rate-limiter acquire.
+
+        Args:
+            pending: (document, embedding text) pairs from _process_file
+
+        Returns:
+            The documents with embeddings set
+        """
+        batch_size = self.config.indexing.embedding_batch_size
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            await self.rate_limiter.acquire(tokens=500 * len(batch), request_count=1)
+
+            vectors = await self.rate_limiter.execute_with_retry(
+                partial(self.embedding_provider.create_embeddings, [text for _, text in batch])
+            )
+            for (doc, _), vector in zip(batch, vectors):
+                doc.embedding = vector
+
+        return [doc for doc, _ in pending]
+
+    def _read_and_extract(self, file_meta) -> List[ExtractedFunction]:
+        """Read a file and extract its functions (blocking; run in a thread)."""
+        try:
+            raw = normalize_newlines(file_meta.file_path.read_bytes())
+        except Exception as e:
+            logger.warning(f"Failed to read {file_meta.relative_path}: {e}")
+            raise
+
+        # Valid UTF-8 (the common case) is parsed straight from the bytes
+        # read; otherwise parse the re-encoded text so byte offsets match it
+        try:
+            content = raw.decode('utf-8')
+            code_bytes = raw
+        except UnicodeDecodeError:
+            content = raw.decode('utf-8', errors='ignore')
+            code_bytes = None
+
+        return self._extract_functions(
+            content,
+            file_meta.language,
+            file_meta.file_path,
+            code_bytes=code_bytes
+        )
 
     def _extract_functions(
         self,
         code: str,
         language: str,
-        file_path: Path
+        file_path: Path,
+        code_bytes: Optional[bytes] = None
     ) -> List[ExtractedFunction]:
-        """Extract functions from code using AST."""
+        """
+        Extract functions from code using AST.
+
+        Args:
+            code: Source code
+            language: Language of the file
+            file_path: Path to the file
+            code_bytes: UTF-8 bytes of code if already available (saves a
+                full-file copy)
+
+        Returns:
+            Extracted functions (empty if the language has no parser)
+        """
         if not self.ast_analyzer.tree_sitter_available:
             logger.warning("tree-sitter not available, skipping function extraction")
             return []
@@ -396,37 +639,71 @@ class FunctionIndexManager:
             # Normalize language
             lang_key = self.ast_analyzer._normalize_language(language)
 
-            if lang_key not in self.ast_analyzer.parsers:
+            parser = self.ast_analyzer.get_parser(lang_key)
+            if parser is None:
                 logger.debug(f"No parser for {language}, skipping")
                 return []
 
-            parser = self.ast_analyzer.parsers[lang_key]
-            tree = parser.parse(bytes(code, "utf8"))
+            if code_bytes is None:
+                code_bytes = code.encode("utf-8")
+            tree = parser.parse(code_bytes)
 
             # Get language-specific analyzer
-            from .analyzers import get_analyzer
-            analyzer = get_analyzer(lang_key)
+            analyzer = self._analyzers.get(lang_key)
+            if analyzer is None:
+                analyzer = self._analyzers[lang_key] = get_analyzer(lang_key)
 
             # Extract functions
-            return analyzer.extract_functions(tree, code, file_path)
+            return analyzer.extract_functions(tree, code, file_path, code_bytes=code_bytes)
 
         except Exception as e:
             logger.error(f"Function extraction failed for {file_path}: {e}")
             return []
 
+    def _is_trivial(self, func: ExtractedFunction) -> bool:
+        """Check if a function is boilerplate not worth an LLM call."""
+        if func.name in TRIVIAL_FUNCTION_NAMES:
+            return True
+        line_count = func.line_end - func.line_start + 1
+        return (
+            line_count < self.config.indexing.llm_analysis_min_lines
+            and len(func.code) < TRIVIAL_MAX_CHARS
+        )
+
+    def _trivial_analysis(self, func: ExtractedFunction) -> Dict[str, Any]:
+        """Build the analysis for a trivial function without the LLM."""
+        qualified_name = f"{func.class_name}.{func.name}" if func.class_name else func.name
+
+        if func.name == '__init__':
+            description = f"{func.class_name or 'Class'} constructor"
+        elif func.name in ('setUp', 'tearDown'):
+            description = f"Test fixture {qualified_name}"
+        else:
+            description = f"Function {qualified_name}({', '.join(func.parameters)})"
+            if func.return_type:
+                description += f" -> {func.return_type}"
+
+        return {
+            "description": func.docstring or description,
+            "purpose": "",
+            "input_description": ", ".join(func.parameters),
+            "output_description": func.return_type or "",
+            "side_effects": [],
+            "complexity": "low"
+        }
+
     async def _analyze_function(
         self,
         func: ExtractedFunction,
-        project_context,
+        prompt_header: str,
         file_meta
-    ) -> Dict[str, Any]:
-        """Analyze a function with LLM."""
+    ) -> Optional[Dict[str, Any]]:
+        """Analyze a function with LLM; None if the request failed."""
 
         # Rate limit
         await self.rate_limiter.acquire(tokens=1500, request_count=1)
 
-        prompt = self._build_function_prompt(func, project_context, file_meta)
-        schema = self._get_function_schema()
+        prompt = self._build_function_prompt(func, prompt_header, file_meta)
 
         try:
             response = await self.llm_provider.chat_completion(
@@ -437,82 +714,62 @@ class FunctionIndexManager:
                     ),
                     ChatMessage(role="user", content=prompt)
                 ],
-                response_format={"type": "json_schema", "json_schema": schema},
+                response_format={"type": "json_schema", "json_schema": FUNCTION_ANALYSIS_SCHEMA},
                 use_reasoning=False  # Faster analysis for functions
             )
 
-            return json.loads(response.content)
+            return fast_json.loads(response.content)
 
         except Exception as e:
             logger.warning(f"LLM analysis failed for {func.name}: {e}")
-            # Return minimal analysis
-            return {
-                "description": func.docstring or f"Function {func.name}",
-                "purpose": "",
-                "input_description": "",
-                "output_description": "",
-                "side_effects": [],
-                "complexity": "medium"
-            }
+            return None
+
+    @staticmethod
+    def _fallback_analysis(func: ExtractedFunction) -> Dict[str, Any]:
+        """Minimal analysis for a function whose LLM request failed (never cached)."""
+        return {
+            "description": func.docstring or f"Function {func.name}",
+            "purpose": "",
+            "input_description": "",
+            "output_description": "",
+            "side_effects": [],
+            "complexity": "medium"
+        }
+
+    @staticmethod
+    def _analysis_key(func: ExtractedFunction, language: str, prompt_header: str) -> str:
+        """Content hash of a function's code, language and project context."""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (prompt_header, language, func.code):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _build_prompt_header(self, project_context) -> str:
+        """Build the project part of the function-analysis prompt."""
+        return FUNCTION_PROMPT_HEADER_TEMPLATE.format(
+            name=project_context.project_name,
+            tech_stack=', '.join(project_context.tech_stack),
+            frameworks=', '.join(project_context.frameworks),
+            purpose=project_context.purpose
+        )
 
     def _build_function_prompt(
         self,
         func: ExtractedFunction,
-        project_context,
+        prompt_header: str,
         file_meta
     ) -> str:
         """Build prompt for function analysis."""
-        return f"""Analyze this function from a {project_context.project_name} project.
-
-PROJECT CONTEXT:
-- Name: {project_context.project_name}
-- Tech Stack: {', '.join(project_context.tech_stack)}
-- Frameworks: {', '.join(project_context.frameworks)}
-- Purpose: {project_context.purpose}
-
-FILE: {file_meta.relative_path}
-LANGUAGE: {file_meta.language}
-
-FUNCTION:
-```{file_meta.language}
-{func.code}
-```
-
-{"DOCSTRING: " + func.docstring if func.docstring else ""}
-{"CLASS: " + func.class_name if func.class_name else ""}
-{"DECORATORS: " + ", ".join(func.decorators) if func.decorators else ""}
-
-Analyze and return JSON:
-{{
-  "description": "Brief description of what this function does (1-2 sentences)",
-  "purpose": "Why does this function exist in the project context?",
-  "input_description": "What are the inputs and their expected types/formats?",
-  "output_description": "What is returned and when?",
-  "side_effects": ["list of side effects like database writes, API calls, etc."],
-  "complexity": "low|medium|high (based on logic complexity)"
-}}
-"""
-
-    def _get_function_schema(self) -> Dict[str, Any]:
-        """Get JSON schema for function analysis."""
-        return {
-            "name": "function_analysis",
-            "strict": True,
-            "schema": {
-                "type": "object",
-                "properties": {
-                    "description": {"type": "string"},
-                    "purpose": {"type": "string"},
-                    "input_description": {"type": "string"},
-                    "output_description": {"type": "string"},
-                    "side_effects": {"type": "array", "items": {"type": "string"}},
-                    "complexity": {"type": "string", "enum": ["low", "medium", "high"]}
-                },
-                "required": ["description", "purpose", "input_description",
-                            "output_description", "side_effects", "complexity"],
-                "additionalProperties": False
-            }
-        }
+        return FUNCTION_PROMPT_TEMPLATE.format(
+            header=prompt_header,
+            file=file_meta.relative_path,
+            language=file_meta.language,
+            code=func.code,
+            docstring="DOCSTRING: " + func.docstring if func.docstring else "",
+            class_name="CLASS: " + func.class_name if func.class_name else "",
+            decorators="DECORATORS: " + ", ".join(func.decorators) if func.decorators else ""
+        )
 
     def _prepare_embedding_text(
         self,
@@ -541,17 +798,17 @@ Analyze and return JSON:
             parts.append(f"Output: {analysis['output_description']}")
 
         # Include some code context
-        code_snippet = func.code[:500] if len(func.code) > 500 else func.code
-        parts.append(f"Code:\n{code_snippet}")
+        parts.append(f"Code:\n{func.code[:500]}")
 
         return "\n".join(parts)
 
     def _generate_function_id(self, project_path: Path, func: ExtractedFunction) -> str:
         """Generate unique ID for a function."""
-        project_hash = hashlib.sha256(str(project_path.resolve()).encode()).hexdigest()[:12]
-        # Include line numbers to handle function name collisions
+        project_hash = project_path_hash(str(project_path))
+        # Include line numbers to handle function name collisions; the ID only
+        # needs to be unique, so a short BLAKE2b digest is enough
         func_key = f"{func.file_path}:{func.name}:{func.line_start}"
-        func_hash = hashlib.sha256(func_key.encode()).hexdigest()[:8]
+        func_hash = hashlib.blake2b(func_key.encode(), digest_size=4).hexdigest()
         return f"func:{project_hash}:{func_hash}"
 
     async def search_functions(
@@ -583,11 +840,11 @@ Analyze and return JSON:
             query_embedding = await self.embedding_provider.create_embedding(query)
 
             # Build filter
-            metadata_filter = {}
-            if language:
-                metadata_filter["language"] = language
-            if class_name:
-                metadata_filter["class_name"] = class_name
+            metadata_filter = {
+                key: value
+                for key, value in (("language", language), ("class_name", class_name))
+                if value
+            }
 
             # Search
             results = await self.chroma.search(
@@ -600,21 +857,11 @@ Analyze and return JSON:
             # Format results
             formatted_results = []
             for result in results:
-                formatted_results.append({
-                    "function_name": result.metadata.get("function_name"),
-                    "relative_path": result.metadata.get("relative_path"),
-                    "line_start": result.metadata.get("line_start"),
-                    "line_end": result.metadata.get("line_end"),
-                    "class_name": result.metadata.get("class_name"),
-                    "is_method": result.metadata.get("is_method"),
-                    "is_async": result.metadata.get("is_async"),
-                    "language": result.metadata.get("language"),
-                    "description": result.metadata.get("description"),
-                    "purpose": result.metadata.get("purpose"),
-                    "complexity": result.metadata.get("complexity"),
-                    "score": result.score,
-                    "code": result.code
-                })
+                metadata_get = result.metadata.get
+                formatted = {key: metadata_get(key) for key in SEARCH_RESULT_KEYS}
+                formatted["score"] = result.score
+                formatted["code"] = result.code
+                formatted_results.append(formatted)
 
             return {
                 "status": "success",
@@ -711,13 +958,13 @@ Analyze and return JSON:
         # A more sophisticated implementation would selectively update
         project_str = str(project_path.resolve())
 
-        for file_path in file_paths:
-            # Clear checkpoint for this file to force reindex
-            self.checkpoint_manager.conn.cursor().execute("""
-                DELETE FROM function_index_checkpoints
-                WHERE project_path = ? AND file_path = ?
-            """, (project_str, file_path))
-        self.checkpoint_manager.conn.commit()
+        # Drop the files' current functions: with their checkpoints cleared,
+        # index_functions no longer knows they were indexed before
+        collection = self.chroma.get_or_create_collection(project_path, collection_type='functions')
+        await self.chroma.delete_files_by_path(collection, project_path, file_paths)
+
+        # Clear checkpoints of these files to force reindex
+        self.checkpoint_manager.clear_function_files(project_str, file_paths)
 
         # Re-index (will only process the cleared files)
         return await self.index_functions(project_path, force_reindex=False)
@@ -740,17 +987,7 @@ Analyze and return JSON:
         try:
             collection = self.chroma.get_or_create_collection(project_path, collection_type='functions')
 
-            total_removed = 0
-            for file_path in file_paths:
-                # Find all functions from this file
-                results = collection.get(
-                    where={"relative_path": file_path},
-                    include=["metadatas"]
-                )
-
-                if results and results["ids"]:
-                    collection.delete(ids=results["ids"])
-                    total_removed += len(results["ids"])
+            total_removed = await self.chroma.delete_files_by_path(collection, project_path, file_paths)
 
             return {
                 "status": "success",
@@ -1,27 +1,42 @@
 """Main indexing orchestrator."""
 
 import asyncio
-import hashlib
 import time
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from ..config import Config
 from ..indexer.analyzer import analyze_code
 from ..indexer.chunker import chunk_code_file
 from ..indexer.context_analyzer import analyze_project_context
-from ..indexer.embedder import batch_generate_embeddings, prepare_embedding_text
+from ..indexer.embedder import create_embeddings_cached, prepare_embedding_text
 from ..indexer.scanner import scan_project
 from ..indexer.simple_checkpoint import SimpleCheckpoint
 from ..providers.base import LLMProvider, EmbeddingProvider
-from ..storage.chroma_client import ChromaManager
+from ..storage.chroma_client import ChromaManager, project_path_hash
+from ..storage.embedding_cache import EmbeddingCache
 from ..storage.models import IndexedDocument, ProjectContext
+from ..storage.response_cache import ResponseCache
+from ..utils.content_hash import file_content_hash
 from ..utils.logger import get_logger
 from ..utils.rate_limiter import RateLimiter
+from ..utils.text import decode_text
 
 logger = get_logger(__name__)
 
 
+def _read_and_hash(file_path: Path) -> Tuple[str, int, float]:
+    """Hash a file and stat it in one go (blocking; run in a thread)."""
+    stat = file_path.stat()
+    # Streamed, so the file is never held in memory just to be hashed
+    with open(file_path, 'rb') as f:
+        return file_content_hash(f), stat.st_size, stat.st_mtime
+
+
 class IndexManager:
     """Manages the complete indexing pipeline."""
 
@@ -31,7 +46,9 @@ class IndexManager:
         chroma: ChromaManager,
         llm_provider: LLMProvider,
         embedding_provider: EmbeddingProvider,
-        rate_limiter: RateLimiter
+        rate_limiter: RateLimiter,
+        response_cache: Optional[ResponseCache] = None,
+        embedding_cache: Optional[EmbeddingCache] = None
     ):
         """
         Initialize index manager.
@@ -42,12 +59,17 @@ class IndexManager:
             llm_provider: LLM provider for code analysis.
             embedding_provider: Embedding provider for vector generation.
             rate_limiter: Rate limiter for API calls.
+            response_cache: Optional persistent cache of chunk analyses by
+                exact prompt (unchanged chunks skip the LLM).
+            embedding_cache: Optional persistent cache of embeddings by text.
         """
         self.config = config
         self.chroma = chroma
         self.llm_provider = llm_provider
         self.embedding_provider = embedding_provider
         self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+        self.embedding_cache = embedding_cache
 
         # DEPRECATED - kept for backward compatibility if needed
         self.openai_client = None
@@ -123,7 +145,7 @@ class IndexManager:
             logger.info("Step 1: Analyzing project context")
 
             project_context = await self.rate_limiter.execute_with_retry(
-                lambda: analyze_project_context(project_path, self.llm_provider)
+                partial(analyze_project_context, project_path, self.llm_provider)
             )
 
             stats["context_analysis_seconds"] = time.time() - context_start
@@ -147,11 +169,15 @@ class IndexManager:
             logger.info(f"Include patterns: {include_patterns}")
             logger.info(f"Exclude patterns: {exclude_pats}")
 
+            # Reuse stored hashes for files whose size and mtime have not changed
+            file_states = checkpoint.get_file_states(str(project_path))
+
             file_metadatas = await scan_project(
                 project_path,
                 include_patterns,
                 exclude_pats,
-                max_file_size_mb=self.config.indexing.max_file_size_mb
+                max_file_size_mb=self.config.indexing.max_file_size_mb,
+                known_files=file_states
             )
 
             stats["total_files"] = len(file_metadatas)
@@ -159,92 +185,122 @@ class IndexManager:
 
             # Filter files that need indexing based on checkpoints
             files_to_process = []
+            touched_files = {}
             for file_meta in file_metadatas:
                 rel_path = str(file_meta.relative_path)
                 if checkpoint.should_reindex_file(str(project_path), rel_path, file_meta.hash):
                     files_to_process.append(file_meta)
                 else:
                     stats["skipped_files"] += 1
+                    fingerprint = (file_meta.file_size, file_meta.last_modified)
+                    state = file_states.get(rel_path)
+                    if state is None or state[:2] != fingerprint:
+                        touched_files[rel_path] = fingerprint
+
+            # Same content, new mtime: remember it so the next scan skips hashing
+            checkpoint.update_file_fingerprints(str(project_path), touched_files)
 
             logger.info(f"Processing {len(files_to_process)} files (skipped {stats['skipped_files']} already indexed)")
 
             # Step 3-5: Process files (analyze, embed, store)
-            indexed_docs = []
-
-            # Process files with limited concurrency
-            sem = asyncio.Semaphore(self.config.indexing.max_concurrent_files)
             processed_count = 0
             progress_lock = asyncio.Lock()
 
             async def process_file(file_meta):
                 nonlocal processed_count
-                async with sem:
-                    try:
-                        # Log start with progress
-                        async with progress_lock:
-                            processed_count += 1
-                            current = processed_count
-                        logger.info(f"[{current}/{len(files_to_process)}] Processing: {file_meta.relative_path}")
-
-                        docs = await self._process_file(file_meta, project_path, project_context)
-
-                        # Mark file as completed in checkpoint
-                        checkpoint.mark_file_completed(
-                            str(project_path),
-                            str(file_meta.relative_path),
-                            file_meta.hash
-                        )
-
-                        return docs, None
-                    except Exception as e:
-                        logger.error(f"✗ Failed: {file_meta.relative_path} - {e}")
-
-                        # Mark file as failed in checkpoint
-                        checkpoint.mark_file_completed(
-                            str(project_path),
-                            str(file_meta.relative_path),
-                            file_meta.hash,
-                            error=str(e)
-                        )
-
-                        return [], str(e)
-
-            # Process files in chunks to control memory
-            CHUNK_SIZE = 50
-            all_results = []
-
-            for chunk_start in range(0, len(files_to_process), CHUNK_SIZE):
-                chunk_end = min(chunk_start + CHUNK_SIZE, len(files_to_process))
-                chunk_files = files_to_process[chunk_start:chunk_end]
-
-                logger.info(f"Processing files {chunk_start+1}-{chunk_end}/{len(files_to_process)}")
-
-                tasks = [process_file(fm) for fm in chunk_files]
-                chunk_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                for i, result in enumerate(chunk_results):
-                    if isinstance(result, Exception):
-                        logger.error(f"File processing exception: {result}")
-                        all_results.append(([], str(result)))
-                    else:
-                        all_results.append(result)
-
-            results = all_results
-
-            for docs, error in results:
-                if docs:
-                    indexed_docs.extend(docs)
-                    stats["indexed_files"] += 1
-                    stats["total_chunks"] += len(docs)
-                if error:
-                    stats["failed_files"] += 1
-                    errors.append({"file": "", "error": error})
+                try:
+                    # Log start with progress
+                    async with progress_lock:
+                        processed_count += 1
+                        current = processed_count
+                    logger.info(f"[{current}/{len(files_to_process)}] Processing: {file_meta.relative_path}")
 
-            # Store all documents in ChromaDB
-            if indexed_docs:
-                logger.info(f"Storing {len(indexed_docs)} chunks in ChromaDB...")
-                await self.chroma.add_documents(collection, indexed_docs)
-                logger.info("✓ All chunks stored")
+                    docs = await self._process_file(file_meta, project_path, project_context)
+                    return file_meta, docs, None
+                except Exception as e:
+                    logger.error(f"✗ Failed: {file_meta.relative_path} - {e}")
+                    return file_meta, [], str(e)
+
+            def record_failure(file_meta, error):
+                stats["failed_files"] += 1
+                errors.append({"file": str(file_meta.relative_path), "error": error})
+
+                # Mark file as failed in checkpoint
+                checkpoint.mark_file_completed(
+                    str(project_path),
+                    str(file_meta.relative_path),
+                    file_meta.hash,
+                    error=error
+                )
+
+            # A fixed pool of workers pulls files from a queue: the pool bounds
+            # concurrency, so there are no fixed-size batches whose slowest
+            # file holds back the rest
+            queue: asyncio.Queue = asyncio.Queue()
+            for file_meta in files_to_process:
+                queue.put_nowait(file_meta)
+
+            num_workers = min(self.config.indexing.max_concurrent_files, len(files_to_process))
+            for _ in range(num_workers):
+                queue.put_nowait(None)  # One stop sentinel per worker
+
+            # Finished files stream to one storer that writes chunks to
+            # ChromaDB in batches; bounded, so workers pause if storing lags
+            store_queue: asyncio.Queue = asyncio.Queue(maxsize=max(num_workers, 1) * 2)
+            chroma_batch_size = self.config.indexing.chroma_batch_size
+
+            async def worker():
+                while (file_meta := await queue.get()) is not None:
+                    await store_queue.put(await process_file(file_meta))
+
+            async def flush(group):
+                docs = list(chain.from_iterable(file_docs for _, file_docs in group))
+                try:
+                    await self.chroma.add_documents(collection, docs)
+                except Exception as e:
+                    logger.error(f"✗ Failed to store {len(docs)} chunks: {e}")
+                    for file_meta, _ in group:
+                        record_failure(file_meta, str(e))
+                    return
+
+                logger.info(f"Stored {len(docs)} chunks in ChromaDB")
+                stats["total_chunks"] += len(docs)
+
+                # Mark files as completed only once their chunks are stored
+                for file_meta, file_docs in group:
+                    if file_docs:
+                        stats["indexed_files"] += 1
+                    checkpoint.mark_file_completed(
+                        str(project_path),
+                        str(file_meta.relative_path),
+                        file_meta.hash,
+                        file_size=file_meta.file_size,
+                        file_mtime=file_meta.last_modified
+                    )
+
+            async def storer():
+                group = []
+                pending_count = 0
+                while (result := await store_queue.get()) is not None:
+                    file_meta, docs, error = result
+                    if error:
+                        record_failure(file_meta, error)
+                        continue
+
+                    group.append((file_meta, docs))
+                    pending_count += len(docs)
+                    if pending_count >= chroma_batch_size:
+                        await flush(group)
+                        group, pending_count = [], 0
+
+                if group:
+                    await flush(group)
+
+            async def produce():
+                await asyncio.gather(*(worker() for _ in range(num_workers)))
+                await store_queue.put(None)
+
+            await asyncio.gather(produce(), storer())
 
             stats["duration_seconds"] = time.time() - start_time
 
@@ -294,7 +350,8 @@ class IndexManager:
         """
         # Read file
         try:
-            content = file_meta.file_path.read_text(encoding='utf-8', errors='ignore')
+            # Off the event loop, so a slow disk doesn't stall other files
+            content = decode_text(await asyncio.to_thread(file_meta.file_path.read_bytes))
         except Exception as e:
             logger.warning(f"Failed to read {file_meta.relative_path}: {e}")
             raise
@@ -308,44 +365,52 @@ class IndexManager:
             overlap_tokens=self.config.indexing.chunk_overlap_tokens
         )
 
-        indexed_docs = []
-
-        for i, chunk in enumerate(chunks, 1):
-            chunk_info = f" [{i}/{len(chunks)}]" if len(chunks) > 1 else ""
-
-            # Analyze with LLM provider (with rate limiting)
-            await self.rate_limiter.acquire(tokens=1000, request_count=1)
-
-            analysis = await self.rate_limiter.execute_with_retry(
-                lambda: analyze_code(
+        # Analyze all chunks concurrently (each LLM request rate limited;
+        # cached responses skip the limiter)
+        async def analyze_chunk(chunk):
+            return await self.rate_limiter.execute_with_retry(
+                partial(
+                    analyze_code,
                     chunk.content,
                     file_meta.file_path,
                     file_meta.language,
                     file_meta.file_type,
                     project_context,
-                    self.llm_provider
+                    self.llm_provider,
+                    response_cache=self.response_cache,
+                    rate_limiter=self.rate_limiter
                 )
             )
 
-            logger.info(f"  ✓ Analyzed{chunk_info}")
-
-            # Prepare text for embedding
-            embedding_text = prepare_embedding_text(
-                chunk.content,
-                file_meta.relative_path,
-                analysis,
-                project_context
-            )
-
-            # Generate embedding (with rate limiting)
-            await self.rate_limiter.acquire(tokens=500, request_count=1)
-
-            embedding_vector = await self.rate_limiter.execute_with_retry(
-                lambda: self.embedding_provider.create_embedding(embedding_text)
-            )
+        analyses = await asyncio.gather(*(analyze_chunk(chunk) for chunk in chunks))
+        logger.debug("  Analyzed %d chunks of %s", len(chunks), file_meta.relative_path)
+
+        # Prepare texts for embedding
+        embedding_texts = [
+            prepare_embedding_text(chunk.content, file_meta.relative_path, analysis, project_context)
+            for chunk, analysis in zip(chunks, analyses)
+        ]
+
+        embedding_vectors = await self._embed_texts(embedding_texts)
+
+        logger.debug("  Embedded %d chunks of %s", len(chunks), file_meta.relative_path)
+
+        # Metadata shared by every chunk of the file, built once
+        file_metadata = {
+            "file_path": str(file_meta.file_path),
+            "relative_path": str(file_meta.relative_path),
+            "language": file_meta.language,
+            "file_type": file_meta.file_type,
+            "last_modified": file_meta.last_modified,
+            "file_size": file_meta.file_size,
+            "indexed_at": time.time(),
+            "project_root": str(project_path),
+            "hash": file_meta.hash
+        }
 
-            logger.info(f"  ✓ Embedded{chunk_info}")
+        indexed_docs = []
 
+        for chunk, analysis, embedding_vector in zip(chunks, analyses, embedding_vectors):
             # Create indexed document
             doc_id = self.chroma.generate_document_id(
                 project_path,
@@ -354,21 +419,13 @@ class IndexManager:
             )
 
             metadata = {
-                "file_path": str(file_meta.file_path),
-                "relative_path": str(file_meta.relative_path),
+                **file_metadata,
                 "chunk_index": chunk.chunk_index,
                 "total_chunks": chunk.total_chunks,
-                "language": file_meta.language,
-                "file_type": file_meta.file_type,
-                "last_modified": file_meta.last_modified,
-                "file_size": file_meta.file_size,
                 # Convert lists to comma-separated strings for ChromaDB
                 "dependencies": ", ".join(analysis.dependencies) if analysis.dependencies else "",
                 "exported_symbols": ", ".join(analysis.exported_symbols) if analysis.exported_symbols else "",
-                "purpose": analysis.purpose,
-                "indexed_at": time.time(),
-                "project_root": str(project_path),
-                "hash": file_meta.hash
+                "purpose": analysis.purpose
             }
 
             doc = IndexedDocument(
@@ -382,6 +439,25 @@ class IndexManager:
 
         return indexed_docs
 
+    async def _embed_texts(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed texts in batched requests, skipping cached ones.
+
+        Args:
+            texts: Texts to embed.
+
+        Returns:
+            Embeddings in the same order as texts.
+        """
+        # One rate-limited request per embedding_batch_size texts
+        return await create_embeddings_cached(
+            texts,
+            self.embedding_provider,
+            cache=self.embedding_cache,
+            rate_limiter=self.rate_limiter,
+            batch_size=self.config.indexing.embedding_batch_size
+        )
+
     async def _store_project_context(
         self,
         collection,
@@ -484,6 +560,7 @@ Purpose: {context.purpose}
 
         stats = {
             "updated_files": 0,
+            "skipped_files": 0,
             "failed_files": 0,
             "total_chunks": 0
         }
@@ -494,7 +571,7 @@ Purpose: {context.purpose}
             collection = self.chroma.get_or_create_collection(project_path)
 
             # Get project context (should already exist)
-            project_hash = hashlib.sha256(str(project_path.resolve()).encode()).hexdigest()[:12]
+            project_hash = project_path_hash(str(project_path))
             context_id = f"{project_hash}:__project_context__:0"
 
             try:
@@ -519,39 +596,63 @@ Purpose: {context.purpose}
                     "error": "Project not indexed. Please run index_project first."
                 }
 
+            # Hash the files and skip those whose indexed hash still matches
+            file_states = {}
+            for file_path_str in expanded_files:
+                file_path = project_path / file_path_str
+
+                if not file_path.exists():
+                    logger.warning(f"File not found: {file_path_str}")
+                    errors.append({"file": file_path_str, "error": "File not found"})
+                    stats["failed_files"] += 1
+                    continue
+
+                try:
+                    file_states[file_path_str] = await asyncio.to_thread(_read_and_hash, file_path)
+                except Exception as e:
+                    logger.error(f"Failed to read {file_path_str}: {e}")
+                    errors.append({"file": file_path_str, "error": str(e)})
+                    stats["failed_files"] += 1
+
+            stored_hashes = await self.chroma.get_file_hashes(collection, list(file_states))
+            unchanged = {
+                file_path_str for file_path_str, (file_hash, _, _) in file_states.items()
+                if stored_hashes.get(file_path_str) == file_hash
+            }
+            stats["skipped_files"] = len(unchanged)
+            if unchanged:
+                logger.info(f"Skipped {len(unchanged)} unchanged files")
+
+            changed_files = [p for p in expanded_files if p not in unchanged]
+
             # Delete old versions of these files
-            deleted_count = await self.chroma.delete_files_by_path(collection, project_path, expanded_files)
+            deleted_count = await self.chroma.delete_files_by_path(collection, project_path, changed_files)
             logger.info(f"Deleted {deleted_count} old documents")
 
             # Scan and process the specified files
             from ..indexer.scanner import detect_language, classify_file_type
-            import hashlib as hash_module
 
             indexed_docs = []
+            chroma_batch_size = self.config.indexing.chroma_batch_size
 
-            for file_path_str in expanded_files:
-                file_path = project_path / file_path_str
+            for file_path_str in changed_files:
+                if file_path_str not in file_states:
+                    continue  # Missing or unreadable, already reported
 
-                if not file_path.exists():
-                    logger.warning(f"File not found: {file_path_str}")
-                    errors.append({"file": file_path_str, "error": "File not found"})
-                    stats["failed_files"] += 1
-                    continue
+                file_path = project_path / file_path_str
+                file_hash, file_size, file_mtime = file_states[file_path_str]
 
                 try:
                     # Create file metadata
                     from ..storage.models import FileMetadata
 
-                    content = file_path.read_bytes()
-                    file_hash = hash_module.sha256(content).hexdigest()
-
                     file_meta = FileMetadata(
                         file_path=file_path,
                         relative_path=Path(file_path_str),
                         language=detect_language(file_path),
                         file_type=classify_file_type(file_path),
-                        file_size=file_path.stat().st_size,
-                        last_modified=file_path.stat().st_mtime,
+                        file_size=file_size,
+                        last_modified=file_mtime,
                         hash=file_hash
                     )
 
@@ -562,15 +663,20 @@ Purpose: {context.purpose}
                     stats["updated_files"] += 1
                     stats["total_chunks"] += len(docs)
 
+                    # Store in batches as chunks accumulate
+                    if len(indexed_docs) >= chroma_batch_size:
+                        await self.chroma.add_documents(collection, indexed_docs)
+                        indexed_docs = []
+
                 except Exception as e:
                     logger.error(f"Failed to process {file_path_str}: {e}")
                     errors.append({"file": file_path_str, "error": str(e)})
                     stats["failed_files"] += 1
 
-            # Store updated documents
+            # Store remaining updated documents
             if indexed_docs:
                 await self.chroma.add_documents(collection, indexed_docs)
-                logger.info(f"✅ Updated {stats['updated_files']} files ({stats['total_chunks']} chunks)")
+            logger.info(f"✅ Updated {stats['updated_files']} files ({stats['total_chunks']} chunks)")
 
             return {
                 "status": "success" if stats["failed_files"] == 0 else "partial",
@@ -694,7 +800,7 @@ Purpose: {context.purpose}
 
         return relative_paths
 
-    async def generate_query_embedding(self, query: str) -> List[float]:
+    async def generate_query_embedding(self, query: str) -> np.ndarray:
         """
         Генерация embedding для поискового запроса с rate limiting.
 
@@ -702,12 +808,12 @@ Purpose: {context.purpose}
             query: Текст запроса
 
         Returns:
-            Список float - embedding вектор
+            Embedding вектор (float32 ndarray)
         """
         await self.rate_limiter.acquire(tokens=500, request_count=1)
 
         embedding = await self.rate_limiter.execute_with_retry(
-            lambda: self.embedding_provider.create_embedding(query)
+            partial(self.embedding_provider.create_embedding, query)
         )
 
         return embedding
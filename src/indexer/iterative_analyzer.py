@@ -1,15 +1,19 @@
 """Iterative project analyzer with confidence scores (Index 1)."""
 
+import asyncio
 import json
 from dataclasses import asdict
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 
+import aiofiles
+
 from ..providers.base import ChatMessage, LLMProvider
 from ..storage.analysis_repository import AnalysisRepository
 from ..storage.models import AnalysisField, ProjectAnalysisResult
 from ..utils.logger import get_logger
 from ..utils.rate_limiter import RateLimiter
+from ..utils.text import decode_text
 
 logger = get_logger(__name__)
 
@@ -310,20 +314,33 @@ class IterativeProjectAnalyzer:
         """Read file contents."""
         contexts = []
         max_content_length = 10000  # Truncate very large files
+        # A UTF-8 character is at most 4 bytes, so this many bytes always
+        # covers max_content_length characters plus one to detect truncation
+        max_read_bytes = (max_content_length + 1) * 4
+
+        async def read_head(full_path: Path) -> str:
+            async with aiofiles.open(full_path, 'rb') as f:
+                raw = await f.read(max_read_bytes)
+            return decode_text(raw)
+
+        # Read all files concurrently instead of blocking the event loop per file
+        results = await asyncio.gather(
+            *(read_head(project_path / rel_path) for rel_path in file_paths),
+            return_exceptions=True
+        )
 
-        for rel_path in file_paths:
-            full_path = project_path / rel_path
-            try:
-                content = full_path.read_text(encoding='utf-8', errors='ignore')
-                if len(content) > max_content_length:
-                    content = content[:max_content_length] + "\n... [TRUNCATED]"
-
-                contexts.append({
-                    "path": rel_path,
-                    "content": content
-                })
-            except Exception as e:
-                logger.warning(f"Could not read {rel_path}: {e}")
+        for rel_path, content in zip(file_paths, results):
+            if isinstance(content, Exception):
+                logger.warning(f"Could not read {rel_path}: {content}")
+                continue
+
+            if len(content) > max_content_length:
+                content = content[:max_content_length] + "\n... [TRUNCATED]"
+
+            contexts.append({
+                "path": rel_path,
+                "content": content
+            })
 
         return contexts
 
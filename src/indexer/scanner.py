@@ -1,13 +1,14 @@
 """File scanning with gitignore support and pattern matching."""
 
-import hashlib
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Collection, Dict, List, Optional, Tuple, Union
 
 import pathspec
 
 from ..config import FilePatterns
 from ..storage.models import FileMetadata
+from ..utils.content_hash import file_content_hash
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -40,22 +41,55 @@ LANGUAGE_MAP = {
 }
 
 
+# Raw glob patterns or a spec already compiled with compile_patterns()
+Patterns = Union[List[str], pathspec.PathSpec]
+
+
+@lru_cache(maxsize=32)
+def compile_patterns(patterns: Tuple[str, ...]) -> pathspec.PathSpec:
+    """
+    Compile gitwildmatch patterns, reusing the spec for repeated pattern sets.
+
+    Args:
+        patterns: Glob patterns (a tuple, so it can be cached).
+
+    Returns:
+        Compiled PathSpec.
+    """
+    return pathspec.PathSpec.from_lines('gitwildmatch', patterns)
+
+
+def _as_spec(patterns: Patterns) -> pathspec.PathSpec:
+    """Return patterns as a compiled PathSpec."""
+    if isinstance(patterns, pathspec.PathSpec):
+        return patterns
+    return compile_patterns(tuple(patterns))
+
+
 async def scan_project(
     project_path: Path,
-    include_patterns: List[str],
-    exclude_patterns: List[str],
+    include_patterns: Patterns,
+    exclude_patterns: Patterns,
     respect_gitignore: bool = True,
-    max_file_size_mb: float = 1.0
+    max_file_size_mb: float = 1.0,
+    known_files: Optional[Dict[str, Tuple[int, float, str]]] = None,
+    include_extensions: Optional[Collection[str]] = None
 ) -> List[FileMetadata]:
     """
     Scan project directory and return file metadata.
 
     Args:
         project_path: Project root path.
-        include_patterns: Glob patterns to include.
-        exclude_patterns: Glob patterns to exclude.
+        include_patterns: Glob patterns to include, or a compiled PathSpec.
+        exclude_patterns: Glob patterns to exclude, or a compiled PathSpec.
         respect_gitignore: Whether to respect .gitignore rules.
         max_file_size_mb: Maximum file size in MB.
+        known_files: Optional map of relative path -> (size, mtime, hash)
+            from a previous run. Files whose size and mtime are unchanged
+            reuse the stored hash instead of being read again.
+        include_extensions: Optional set of file suffixes (e.g. ".py") to
+            include. When given, it replaces include_patterns with a set
+            lookup per file.
 
     Returns:
         List of FileMetadata for files to index.
@@ -67,9 +101,9 @@ async def scan_project(
     if respect_gitignore:
         gitignore_spec = await get_gitignore_spec(project_path)
 
-    # Create pathspec for include/exclude patterns
-    include_spec = pathspec.PathSpec.from_lines('gitwildmatch', include_patterns)
-    exclude_spec = pathspec.PathSpec.from_lines('gitwildmatch', exclude_patterns)
+    # Compile include/exclude patterns (cached across scans)
+    include_spec = _as_spec(include_patterns)
+    exclude_spec = _as_spec(exclude_patterns)
 
     files = []
     max_size_bytes = int(max_file_size_mb * 1024 * 1024)
@@ -91,12 +125,16 @@ async def scan_project(
             if exclude_spec.match_file(relative_str):
                 continue
 
-            # Check include patterns
-            if not include_spec.match_file(relative_str):
+            # Check include patterns (extension set lookup when given)
+            if include_extensions is not None:
+                if file_path.suffix not in include_extensions:
+                    continue
+            elif not include_spec.match_file(relative_str):
                 continue
 
             # Check file size
-            file_size = file_path.stat().st_size
+            stat = file_path.stat()
+            file_size = stat.st_size
             should_index, reason = should_index_file(file_path, file_size, max_size_bytes)
 
             if not should_index:
@@ -106,13 +144,19 @@ async def scan_project(
             # Get file metadata
             language = detect_language(file_path)
             file_type = classify_file_type(file_path)
-            file_hash = await calculate_file_hash(file_path)
+
+            # (size, mtime) first, content hash second: unchanged files are not read
+            known = known_files.get(relative_str) if known_files else None
+            if known and known[:2] == (file_size, stat.st_mtime) and known[2]:
+                file_hash = known[2]
+            else:
+                file_hash = await calculate_file_hash(file_path)
 
             metadata = FileMetadata(
                 file_path=file_path,
                 relative_path=relative_path,
                 file_size=file_size,
-                last_modified=file_path.stat().st_mtime,
+                last_modified=stat.st_mtime,
                 language=language,
                 file_type=file_type,
                 hash=file_hash
@@ -240,20 +284,17 @@ def classify_file_type(file_path: Path) -> str:
 
 async def calculate_file_hash(file_path: Path) -> str:
     """
-    Calculate SHA256 hash of file content.
+    Calculate content hash of a file for change detection.
 
     Args:
         file_path: Path to file.
 
     Returns:
-        Hex digest of SHA256 hash.
+        Hex digest (xxh3-64, or SHA256 without xxhash).
     """
-    hasher = hashlib.sha256()
     try:
         with open(file_path, 'rb') as f:
-            while chunk := f.read(8192):
-                hasher.update(chunk)
-        return hasher.hexdigest()
+            return file_content_hash(f)
     except Exception as e:
         logger.warning(f"Failed to hash {file_path}: {e}")
         return ""
@@ -3,7 +3,7 @@
 import sqlite3
 import json
 from pathlib import Path
-from typing import List, Optional, Set, Dict, Any
+from typing import List, Optional, Set, Dict, Any, Tuple
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -31,6 +31,13 @@ class SimpleCheckpoint:
         self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
 
+        # Checkpoints are written once per file: WAL with synchronous=NORMAL
+        # avoids an fsync on every commit while staying crash-safe
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-64000")
+
         self._init_schema()
 
     def _init_schema(self):
@@ -43,6 +50,8 @@ class SimpleCheckpoint:
                 project_path TEXT NOT NULL,
                 file_path TEXT NOT NULL,
                 file_hash TEXT NOT NULL,
+                file_size INTEGER,
+                file_mtime REAL,
                 status TEXT NOT NULL,
                 error_message TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -60,6 +69,13 @@ class SimpleCheckpoint:
             ON file_checkpoints(project_path, status)
         """)
 
+        # Databases created before fingerprint tracking lack these columns
+        columns = {row['name'] for row in cursor.execute("PRAGMA table_info(file_checkpoints)")}
+        if 'file_size' not in columns:
+            cursor.execute("ALTER TABLE file_checkpoints ADD COLUMN file_size INTEGER")
+        if 'file_mtime' not in columns:
+            cursor.execute("ALTER TABLE file_checkpoints ADD COLUMN file_mtime REAL")
+
         self.conn.commit()
 
     def get_completed_files(self, project_path: str) -> Set[str]:
@@ -80,12 +96,36 @@ class SimpleCheckpoint:
 
         return {row['file_path'] for row in cursor.fetchall()}
 
+    def get_file_states(self, project_path: str) -> Dict[str, Tuple[int, float, str]]:
+        """
+        Get stored (size, mtime, hash) of successfully indexed files.
+
+        Args:
+            project_path: Project root path
+
+        Returns:
+            Dictionary mapping relative file path to (size, mtime, file_hash)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT file_path, file_size, file_mtime, file_hash FROM file_checkpoints
+            WHERE project_path = ? AND status = 'completed'
+                AND file_size IS NOT NULL AND file_mtime IS NOT NULL
+        """, (project_path,))
+
+        return {
+            row['file_path']: (row['file_size'], row['file_mtime'], row['file_hash'])
+            for row in cursor.fetchall()
+        }
+
     def mark_file_completed(
         self,
         project_path: str,
         file_path: str,
         file_hash: str,
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        file_size: Optional[int] = None,
+        file_mtime: Optional[float] = None
     ):
         """
         Mark file as completed or failed.
@@ -95,15 +135,43 @@ class SimpleCheckpoint:
             file_path: Relative file path
             file_hash: File content hash
             error: Error message if failed
+            file_size: File size the hash was computed at
+            file_mtime: File modification time the hash was computed at
         """
         status = 'failed' if error else 'completed'
 
         cursor = self.conn.cursor()
         cursor.execute("""
             INSERT OR REPLACE INTO file_checkpoints
-                (project_path, file_path, file_hash, status, error_message)
-            VALUES (?, ?, ?, ?, ?)
-        """, (project_path, file_path, file_hash, status, error))
+                (project_path, file_path, file_hash, file_size, file_mtime, status, error_message)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (project_path, file_path, file_hash, file_size, file_mtime, status, error))
+
+        self.conn.commit()
+
+    def update_file_fingerprints(
+        self,
+        project_path: str,
+        fingerprints: Dict[str, Tuple[int, float]]
+    ):
+        """
+        Record new (size, mtime) for files whose content did not change.
+
+        Touched-but-identical files then hit the fingerprint check on the
+        next scan instead of being hashed again.
+
+        Args:
+            project_path: Project root path
+            fingerprints: Dictionary mapping relative file path to (size, mtime)
+        """
+        if not fingerprints:
+            return
+
+        cursor = self.conn.cursor()
+        cursor.executemany("""
+            UPDATE file_checkpoints SET file_size = ?, file_mtime = ?
+            WHERE project_path = ? AND file_path = ?
+        """, [(size, mtime, project_path, path) for path, (size, mtime) in fingerprints.items()])
 
         self.conn.commit()
 
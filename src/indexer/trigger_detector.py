@@ -9,6 +9,7 @@ Detects various types of triggers:
 - GraphQL resolvers
 """
 
+from collections import Counter
 from pathlib import Path
 from typing import List, Dict, Optional
 from dataclasses import dataclass
@@ -96,11 +97,7 @@ class TriggerDetector:
         Returns:
             Dict mapping trigger type to count
         """
-        summary = {}
-        for trigger in triggers:
-            trigger_type = trigger.trigger_type
-            summary[trigger_type] = summary.get(trigger_type, 0) + 1
-        return summary
+        return dict(Counter(trigger.trigger_type for trigger in triggers))
 
     def format_trigger_display(self, trigger: TriggerInfo) -> str:
         """
@@ -1,9 +1,12 @@
 """Абстрактные интерфейсы для провайдеров LLM и Embedding."""
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class ChatMessage:
@@ -67,7 +70,7 @@ class EmbeddingProvider(ABC):
     """
 
     @abstractmethod
-    async def create_embedding(self, text: str) -> List[float]:
+    async def create_embedding(self, text: str) -> np.ndarray:
         """
         Создать embedding для текста.
 
@@ -75,10 +78,32 @@ class EmbeddingProvider(ABC):
             text: Текст для генерации embedding
 
         Returns:
-            Список float - вектор embedding
+            Вектор embedding (float32 ndarray)
         """
         pass
 
+    async def create_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Создать embeddings для нескольких текстов.
+
+        Реализация по умолчанию вызывает create_embedding параллельно
+        (не более 16 запросов одновременно). Провайдеры с batch API
+        переопределяют этот метод.
+
+        Args:
+            texts: Тексты для генерации embeddings
+
+        Returns:
+            Список векторов в том же порядке, что и texts
+        """
+        semaphore = asyncio.Semaphore(16)
+
+        async def embed(text: str) -> np.ndarray:
+            async with semaphore:
+                return await self.create_embedding(text)
+
+        return list(await asyncio.gather(*(embed(text) for text in texts)))
+
     @property
     @abstractmethod
     def model_name(self) -> str:
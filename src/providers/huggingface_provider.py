@@ -3,6 +3,7 @@
 import json
 from typing import List, Dict, Any, Optional
 
+import numpy as np
 from openai import AsyncOpenAI
 
 from ..providers.base import LLMProvider, EmbeddingProvider, ChatMessage, LLMResponse
@@ -264,7 +265,7 @@ class HuggingFaceEmbeddingProvider(EmbeddingProvider):
         }
         return known_models.get(model, 384)
 
-    async def create_embedding(self, text: str) -> List[float]:
+    async def create_embedding(self, text: str) -> np.ndarray:
         """
         Create embedding for text using Hugging Face.
 
@@ -272,7 +273,7 @@ class HuggingFaceEmbeddingProvider(EmbeddingProvider):
             text: Text to embed
 
         Returns:
-            List of floats representing the embedding
+            float32 array representing the embedding
         """
         if not self.available:
             raise RuntimeError("Hugging Face client not available. Install huggingface_hub")
@@ -284,11 +285,10 @@ class HuggingFaceEmbeddingProvider(EmbeddingProvider):
                 model=self._model
             )
 
-            # Handle response formats
-            if isinstance(embedding, list):
-                if embedding and isinstance(embedding[0], list):
-                    return embedding[0]
-                return embedding
+            # Handle response formats (nested list or ndarray, one row per input)
+            if isinstance(embedding, (list, np.ndarray)):
+                vector = np.asarray(embedding, dtype=np.float32)
+                return vector[0] if vector.ndim == 2 else vector
             else:
                 raise ValueError(f"Unexpected embedding format: {type(embedding)}")
 
@@ -1,6 +1,9 @@
 """OpenAI реализации LLM и Embedding провайдеров."""
 
+import base64
 from typing import List, Dict, Any, Optional
+
+import numpy as np
 from openai import AsyncOpenAI
 
 from .base import (
@@ -148,6 +151,9 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
     - text-embedding-ada-002 (1536 dim, legacy)
     """
 
+    # Максимум входов в одном запросе к embeddings API
+    MAX_BATCH_INPUTS = 2048
+
     def __init__(
         self,
         api_key: str,
@@ -169,13 +175,31 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
             "text-embedding-ada-002": 1536
         }
 
-    async def create_embedding(self, text: str) -> List[float]:
+    @staticmethod
+    def _decode(item) -> np.ndarray:
+        """Декодировать base64 embedding в float32 ndarray без JSON-списка float."""
+        return np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+
+    async def create_embedding(self, text: str) -> np.ndarray:
         """Создать OpenAI embedding."""
         response = await self._client.embeddings.create(
             input=text,
-            model=self._model
+            model=self._model,
+            encoding_format="base64"
         )
-        return response.data[0].embedding
+        return self._decode(response.data[0])
+
+    async def create_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """Создать OpenAI embeddings пачками (до 2048 текстов за запрос)."""
+        embeddings = []
+        for i in range(0, len(texts), self.MAX_BATCH_INPUTS):
+            response = await self._client.embeddings.create(
+                input=texts[i:i + self.MAX_BATCH_INPUTS],
+                model=self._model,
+                encoding_format="base64"
+            )
+            embeddings.extend(self._decode(item) for item in sorted(response.data, key=lambda d: d.index))
+        return embeddings
 
     @property
     def model_name(self) -> str:
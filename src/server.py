@@ -17,6 +17,8 @@ from .providers import create_providers_from_config
 from .storage.analysis_repository import AnalysisRepository
 from .storage.checkpoint_manager import CheckpointManager
 from .storage.chroma_client import ChromaManager
+from .storage.embedding_cache import EmbeddingCache
+from .storage.response_cache import ResponseCache
 from .utils.logger import setup_logger
 from .utils.rate_limiter import RateLimiter
 
@@ -826,10 +828,13 @@ def main():
             llm_provider, analysis_repo, rate_limiter
         )
 
-        # Initialize file index manager (Index 2)
+        # Initialize file index manager (Index 2); embeddings and LLM analyses
+        # of unchanged texts are reused from the on-disk caches across runs
         file_index_manager = FileIndexManager(
             config, chroma, llm_provider, embedding_provider,
-            rate_limiter, checkpoint_manager, analysis_repo
+            rate_limiter, checkpoint_manager, analysis_repo,
+            embedding_cache=EmbeddingCache(),
+            response_cache=ResponseCache()
         )
 
         # Initialize function index manager (Index 3)
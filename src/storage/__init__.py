@@ -16,6 +16,8 @@ from .models import (
 from .chroma_client import ChromaManager
 from .checkpoint_manager import CheckpointManager
 from .analysis_repository import AnalysisRepository
+from .embedding_cache import EmbeddingCache
+from .response_cache import ResponseCache
 
 __all__ = [
     "AnalysisField",
@@ -32,4 +34,6 @@ __all__ = [
     "ChromaManager",
     "CheckpointManager",
     "AnalysisRepository",
+    "EmbeddingCache",
+    "ResponseCache",
 ]
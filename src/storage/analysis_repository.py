@@ -1,10 +1,12 @@
 """Repository for managing project analysis data (Index 1)."""
 
+import json
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 from .checkpoint_manager import CheckpointManager
 from .models import AnalysisField, ProjectAnalysisResult
+from ..utils import fast_json
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -149,6 +151,32 @@ class AnalysisRepository:
         self.checkpoint_manager.clear_project_analysis(project_path)
         logger.info(f"Cleared analysis data for {project_path}")
 
+    def get_function_analyses(self, code_hashes: List[str]) -> Dict[str, dict]:
+        """
+        Get cached LLM analyses of several functions.
+
+        Args:
+            code_hashes: Content hashes of the functions and their analysis context
+
+        Returns:
+            Dictionary of code hash -> analysis for the cached hashes
+        """
+        return {
+            code_hash: fast_json.loads(analysis_json)
+            for code_hash, analysis_json in self.checkpoint_manager.get_function_analyses(code_hashes).items()
+        }
+
+    def save_function_analyses(self, analyses: Dict[str, dict]) -> None:
+        """
+        Cache LLM analyses of several functions.
+
+        Args:
+            analyses: Dictionary of code hash -> analysis
+        """
+        self.checkpoint_manager.save_function_analyses({
+            code_hash: json.dumps(analysis) for code_hash, analysis in analyses.items()
+        })
+
     def is_analysis_complete(self, project_path: str) -> bool:
         """
         Check if project analysis is complete.
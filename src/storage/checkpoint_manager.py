@@ -1,15 +1,26 @@
 """Unified checkpoint manager for all three index types."""
 
+import functools
 import json
 import sqlite3
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _synchronized(method):
+    """Run a CheckpointManager method while holding its connection lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class CheckpointManager:
     """
     Unified checkpoint manager for tracking indexing progress across all three indices.
@@ -34,6 +45,16 @@ class CheckpointManager:
         self.db_path = self.checkpoint_dir / "unified_checkpoints.db"
         self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        # Writes also run on worker threads (asyncio.to_thread); every use of
+        # the shared connection, here or by callers reading conn, holds this
+        self.lock = threading.RLock()
+
+        # Checkpoints are written once per file: WAL with synchronous=NORMAL
+        # avoids an fsync on every commit while staying crash-safe
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-64000")
 
         self._init_schema()
 
@@ -92,6 +113,8 @@ class CheckpointManager:
                 project_path TEXT NOT NULL,
                 file_path TEXT NOT NULL,
                 file_hash TEXT NOT NULL,
+                file_size INTEGER,
+                file_mtime REAL,
                 chunks_count INTEGER DEFAULT 0,
                 status TEXT NOT NULL,
                 error_message TEXT,
@@ -110,6 +133,13 @@ class CheckpointManager:
             ON file_index_checkpoints(project_path, status)
         """)
 
+        # Databases created before fingerprint tracking lack these columns
+        columns = {row['name'] for row in cursor.execute("PRAGMA table_info(file_index_checkpoints)")}
+        if 'file_size' not in columns:
+            cursor.execute("ALTER TABLE file_index_checkpoints ADD COLUMN file_size INTEGER")
+        if 'file_mtime' not in columns:
+            cursor.execute("ALTER TABLE file_index_checkpoints ADD COLUMN file_mtime REAL")
+
         # =================================================================
         # Index 3: Function Index Checkpoints
         # =================================================================
@@ -138,6 +168,15 @@ class CheckpointManager:
             ON function_index_checkpoints(project_path, status)
         """)
 
+        # LLM analyses keyed by content hash, shared across projects and runs
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS function_analysis_cache (
+                code_hash TEXT PRIMARY KEY,
+                analysis_json TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
         self.conn.commit()
         logger.info(f"Checkpoint database initialized at {self.db_path}")
 
@@ -145,6 +184,7 @@ class CheckpointManager:
     # Index 1: Project Analysis Methods
     # =========================================================================
 
+    @_synchronized
     def save_project_analysis(
         self,
         project_path: str,
@@ -202,6 +242,7 @@ class CheckpointManager:
         ))
         self.conn.commit()
 
+    @_synchronized
     def get_project_analysis(self, project_path: str) -> Optional[Dict[str, Any]]:
         """Get project analysis result."""
         cursor = self.conn.cursor()
@@ -234,6 +275,7 @@ class CheckpointManager:
             "updated_at": row["updated_at"]
         }
 
+    @_synchronized
     def save_analysis_iteration(
         self,
         project_path: str,
@@ -260,6 +302,7 @@ class CheckpointManager:
         ))
         self.conn.commit()
 
+    @_synchronized
     def get_last_iteration(self, project_path: str) -> Optional[Dict[str, Any]]:
         """Get the last analysis iteration for a project."""
         cursor = self.conn.cursor()
@@ -280,6 +323,7 @@ class CheckpointManager:
             "snapshot": json.loads(row["snapshot"]) if row["snapshot"] else {}
         }
 
+    @_synchronized
     def clear_project_analysis(self, project_path: str):
         """Clear all analysis data for a project."""
         cursor = self.conn.cursor()
@@ -292,6 +336,7 @@ class CheckpointManager:
     # Index 2: File Index Checkpoint Methods
     # =========================================================================
 
+    @_synchronized
     def get_file_completed_files(self, project_path: str) -> Set[str]:
         """Get set of successfully indexed file paths for file index."""
         cursor = self.conn.cursor()
@@ -301,24 +346,93 @@ class CheckpointManager:
         """, (project_path,))
         return {row['file_path'] for row in cursor.fetchall()}
 
+    @_synchronized
+    def get_indexed_hashes(self, project_path: str) -> Dict[str, str]:
+        """Get content hash of successfully indexed files for file index."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT file_path, file_hash FROM file_index_checkpoints
+            WHERE project_path = ? AND status = 'completed'
+        """, (project_path,))
+        return {row['file_path']: row['file_hash'] for row in cursor.fetchall()}
+
+    @_synchronized
+    def get_file_fingerprints(self, project_path: str) -> Dict[str, Tuple[int, float, str]]:
+        """Get (size, mtime, hash) of successfully indexed files for file index."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT file_path, file_size, file_mtime, file_hash FROM file_index_checkpoints
+            WHERE project_path = ? AND status = 'completed'
+                AND file_size IS NOT NULL AND file_mtime IS NOT NULL
+        """, (project_path,))
+        return {
+            row['file_path']: (row['file_size'], row['file_mtime'], row['file_hash'])
+            for row in cursor.fetchall()
+        }
+
     def mark_file_indexed(
         self,
         project_path: str,
         file_path: str,
         file_hash: str,
         chunks_count: int = 0,
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        file_size: Optional[int] = None,
+        file_mtime: Optional[float] = None
     ):
         """Mark file as indexed or failed in file index."""
-        status = 'failed' if error else 'completed'
+        self.mark_files_indexed(project_path, [{
+            "file_path": file_path,
+            "file_hash": file_hash,
+            "chunks_count": chunks_count,
+            "error": error,
+            "file_size": file_size,
+            "file_mtime": file_mtime
+        }])
+
+    @_synchronized
+    def mark_files_indexed(self, project_path: str, records: List[Dict[str, Any]]):
+        """
+        Mark several files as indexed or failed in file index with one commit.
+
+        Each record takes the keyword arguments of mark_file_indexed
+        (file_path and file_hash required, the rest optional).
+        """
+        if not records:
+            return
         cursor = self.conn.cursor()
-        cursor.execute("""
+        cursor.executemany("""
             INSERT OR REPLACE INTO file_index_checkpoints
-                (project_path, file_path, file_hash, chunks_count, status, error_message)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (project_path, file_path, file_hash, chunks_count, status, error))
+                (project_path, file_path, file_hash, file_size, file_mtime,
+                 chunks_count, status, error_message)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (project_path, record["file_path"], record["file_hash"],
+             record.get("file_size"), record.get("file_mtime"),
+             record.get("chunks_count", 0),
+             'failed' if record.get("error") else 'completed',
+             record.get("error"))
+            for record in records
+        ])
         self.conn.commit()
 
+    @_synchronized
+    def update_file_fingerprints(
+        self,
+        project_path: str,
+        fingerprints: Dict[str, Tuple[int, float]]
+    ):
+        """Record new (size, mtime) for file index entries whose content did not change."""
+        if not fingerprints:
+            return
+        cursor = self.conn.cursor()
+        cursor.executemany("""
+            UPDATE file_index_checkpoints SET file_size = ?, file_mtime = ?
+            WHERE project_path = ? AND file_path = ?
+        """, [(size, mtime, project_path, path) for path, (size, mtime) in fingerprints.items()])
+        self.conn.commit()
+
+    @_synchronized
     def should_reindex_file(
         self,
         project_path: str,
@@ -341,6 +455,7 @@ class CheckpointManager:
             return True  # Content changed
         return False  # Already indexed and unchanged
 
+    @_synchronized
     def clear_file_index(self, project_path: str):
         """Clear all file index checkpoints for a project."""
         cursor = self.conn.cursor()
@@ -348,6 +463,7 @@ class CheckpointManager:
         self.conn.commit()
         logger.info(f"Cleared file index checkpoints for {project_path}")
 
+    @_synchronized
     def get_file_index_stats(self, project_path: str) -> Dict[str, int]:
         """Get file index statistics."""
         cursor = self.conn.cursor()
@@ -372,6 +488,7 @@ class CheckpointManager:
     # Index 3: Function Index Checkpoint Methods
     # =========================================================================
 
+    @_synchronized
     def get_function_completed_files(self, project_path: str) -> Set[str]:
         """Get set of files with extracted functions."""
         cursor = self.conn.cursor()
@@ -390,15 +507,48 @@ class CheckpointManager:
         error: Optional[str] = None
     ):
         """Mark file as processed for function extraction."""
-        status = 'failed' if error else 'completed'
+        self.mark_function_files_indexed(project_path, [{
+            "file_path": file_path,
+            "file_hash": file_hash,
+            "functions_count": functions_count,
+            "error": error
+        }])
+
+    @_synchronized
+    def mark_function_files_indexed(self, project_path: str, records: List[Dict[str, Any]]):
+        """
+        Mark several files as processed for function extraction with one commit.
+
+        Each record takes the keyword arguments of mark_functions_indexed
+        (file_path and file_hash required, the rest optional).
+        """
+        if not records:
+            return
         cursor = self.conn.cursor()
-        cursor.execute("""
+        cursor.executemany("""
             INSERT OR REPLACE INTO function_index_checkpoints
                 (project_path, file_path, file_hash, functions_count, status, error_message)
             VALUES (?, ?, ?, ?, ?, ?)
-        """, (project_path, file_path, file_hash, functions_count, status, error))
+        """, [
+            (project_path, record["file_path"], record["file_hash"],
+             record.get("functions_count", 0),
+             'failed' if record.get("error") else 'completed',
+             record.get("error"))
+            for record in records
+        ])
         self.conn.commit()
 
+    @_synchronized
+    def clear_function_files(self, project_path: str, file_paths: List[str]):
+        """Clear function index checkpoints of specific files."""
+        cursor = self.conn.cursor()
+        cursor.executemany("""
+            DELETE FROM function_index_checkpoints
+            WHERE project_path = ? AND file_path = ?
+        """, [(project_path, file_path) for file_path in file_paths])
+        self.conn.commit()
+
+    @_synchronized
     def should_reindex_functions(
         self,
         project_path: str,
@@ -421,6 +571,33 @@ class CheckpointManager:
             return True
         return False
 
+    @_synchronized
+    def get_function_analyses(self, code_hashes: List[str]) -> Dict[str, str]:
+        """Get cached function analysis JSON for the hashes that are cached."""
+        found = {}
+        cursor = self.conn.cursor()
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(code_hashes), 500):
+            batch = code_hashes[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            cursor.execute(f"""
+                SELECT code_hash, analysis_json FROM function_analysis_cache
+                WHERE code_hash IN ({placeholders})
+            """, batch)
+            found.update((row['code_hash'], row['analysis_json']) for row in cursor.fetchall())
+        return found
+
+    @_synchronized
+    def save_function_analyses(self, analyses: Dict[str, str]):
+        """Cache function analysis JSON by content hash, in one transaction."""
+        cursor = self.conn.cursor()
+        cursor.executemany("""
+            INSERT OR REPLACE INTO function_analysis_cache (code_hash, analysis_json)
+            VALUES (?, ?)
+        """, analyses.items())
+        self.conn.commit()
+
+    @_synchronized
     def clear_function_index(self, project_path: str):
         """Clear all function index checkpoints for a project."""
         cursor = self.conn.cursor()
@@ -428,6 +605,7 @@ class CheckpointManager:
         self.conn.commit()
         logger.info(f"Cleared function index checkpoints for {project_path}")
 
+    @_synchronized
     def get_function_index_stats(self, project_path: str) -> Dict[str, int]:
         """Get function index statistics."""
         cursor = self.conn.cursor()
@@ -481,6 +659,7 @@ class CheckpointManager:
         self.clear_function_index(project_path)
         logger.info(f"Cleared all index data for {project_path}")
 
+    @_synchronized
     def close(self):
         """Close database connection."""
         if self.conn:
@@ -2,17 +2,97 @@
 
 import asyncio
 import hashlib
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 import chromadb
+import numpy as np
 
 from ..config import ChromaConfig
-from ..storage.models import IndexedDocument, SearchResult
+from ..storage.models import DocumentBatch, IndexedDocument, SearchResult
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Documents per upsert call: bounds peak memory and stays under Chroma's
+# maximum batch size while keeping HNSW inserts batched
+UPSERT_BATCH_SIZE = 5000
+
+# File paths per relative_path "$in" lookup
+PATH_LOOKUP_BATCH_SIZE = 500
+
+
+# chromadb 1.x takes embeddings as an (N, D) ndarray; 0.5 validates each
+# embedding as a Python list
+NDARRAY_EMBEDDINGS = int(getattr(chromadb, "__version__", "0").split(".")[0]) >= 1
+
+
+def _as_chroma_embeddings(embeddings: List) -> Union[np.ndarray, List[List[float]]]:
+    """
+    Stack embedding vectors into one (N, D) float32 matrix for Chroma.
+
+    The matrix is built with a single copy; on chromadb versions that
+    require lists it is expanded with one C-level tolist() call.
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    return matrix if NDARRAY_EMBEDDINGS else matrix.tolist()
+
+
+@lru_cache(maxsize=64)
+def project_path_hash(project_str: str) -> str:
+    """
+    Short hash of the resolved project path.
+
+    Shared by collection names and document IDs of every index; memoized
+    because IDs are built per chunk and per function.
+    """
+    return hashlib.sha256(str(Path(project_str).resolve()).encode()).hexdigest()[:12]
+
+
+def _is_missing_collection_error(error: Exception) -> bool:
+    """Whether error means the collection behind a handle no longer exists."""
+    # NotFoundError on chromadb 1.x, InvalidCollectionException/ValueError on 0.5
+    return (
+        type(error).__name__ in ("NotFoundError", "InvalidCollectionException")
+        or "does not exist" in str(error)
+    )
+
+
+class _CachedCollection:
+    """
+    Cached collection handle that survives the collection being recreated.
+
+    Another process (e.g. the web portal) may delete or recreate a project
+    collection, after which calls through the old handle fail with "does
+    not exist". Such a call fetches the collection again once and retries.
+    """
+
+    def __init__(self, client, collection, metadata: Dict[str, str]):
+        self._client = client
+        self._collection = collection
+        self._metadata = metadata
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._collection, attr)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            try:
+                return getattr(self._collection, attr)(*args, **kwargs)
+            except Exception as e:
+                if not _is_missing_collection_error(e):
+                    raise
+                name = self._collection.name
+                logger.info(f"Collection {name} was replaced; fetching it again")
+                self._collection = self._client.get_or_create_collection(
+                    name=name, metadata=self._metadata
+                )
+                return getattr(self._collection, attr)(*args, **kwargs)
+
+        return call
+
 
 class ChromaManager:
     """Manages ChromaDB operations for project indexing."""
@@ -26,6 +106,10 @@ class ChromaManager:
         """
         self.config = config
 
+        # Collection handles by name; every MCP call starts with a lookup,
+        # which is an HTTP round-trip on a remote server
+        self._collections: Dict[str, Any] = {}
+
         # Initialize client based on configuration
         if config.host and config.port:
             # Remote ChromaDB server
@@ -56,58 +140,94 @@ class ChromaManager:
         """
         collection_name = self._get_collection_name(project_path, collection_type)
 
+        collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
+
+        metadata = {
+            "project_path": str(project_path),
+            "collection_type": collection_type
+        }
+
         try:
             collection = self.client.get_collection(name=collection_name)
             logger.info(f"Using existing collection: {collection_name}")
         except:
             collection = self.client.create_collection(
                 name=collection_name,
-                metadata={
-                    "project_path": str(project_path),
-                    "collection_type": collection_type
-                }
+                metadata=metadata
             )
             logger.info(f"Created new collection: {collection_name}")
 
+        # Handles outlive deletions by other processes (see _CachedCollection)
+        collection = _CachedCollection(self.client, collection, metadata)
+        self._collections[collection_name] = collection
         return collection
 
     async def add_documents(
         self,
         collection,
         documents: List[IndexedDocument],
-        timeout: int = 60
+        timeout: int = 60,
+        batch_size: int = UPSERT_BATCH_SIZE
     ) -> None:
         """
         Add or update documents in collection with timeout.
 
+        Documents are upserted in windows of batch_size.
+
         Args:
             collection: ChromaDB collection.
             documents: List of IndexedDocument objects.
-            timeout: Operation timeout in seconds.
+            timeout: Per-batch operation timeout in seconds.
+            batch_size: Maximum documents per upsert call.
         """
         if not documents:
             return
 
-        ids = [doc.id for doc in documents]
-        contents = [doc.content for doc in documents]
-        embeddings = [doc.embedding for doc in documents]
-        metadatas = [doc.metadata for doc in documents]
+        await self.add_document_batch(
+            collection,
+            DocumentBatch.from_documents(documents),
+            timeout=timeout,
+            batch_size=batch_size
+        )
+
+    async def add_document_batch(
+        self,
+        collection,
+        documents: DocumentBatch,
+        timeout: int = 60,
+        batch_size: int = UPSERT_BATCH_SIZE
+    ) -> None:
+        """
+        Add or update column-form documents in collection with timeout.
+
+        Documents are upserted in windows of batch_size.
+
+        Args:
+            collection: ChromaDB collection.
+            documents: DocumentBatch with parallel id/content/embedding/metadata lists.
+            timeout: Per-batch operation timeout in seconds.
+            batch_size: Maximum documents per upsert call.
+        """
+        if not documents:
+            return
 
         try:
-            # Run upsert in executor with timeout
-            loop = asyncio.get_event_loop()
-            await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    lambda: collection.upsert(
-                        ids=ids,
-                        documents=contents,
-                        embeddings=embeddings,
-                        metadatas=metadatas
-                    )
-                ),
-                timeout=timeout
-            )
+            for start in range(0, len(documents), batch_size):
+                batch = documents.slice(start, start + batch_size)
+
+                # Run upsert in a worker thread with timeout
+                await asyncio.wait_for(
+                    asyncio.to_thread(
+                        collection.upsert,
+                        ids=batch.ids,
+                        documents=batch.contents,
+                        embeddings=_as_chroma_embeddings(batch.embeddings),
+                        metadatas=batch.metadatas
+                    ),
+                    timeout=timeout
+                )
             logger.info(f"Added/updated {len(documents)} documents")
         except asyncio.TimeoutError:
             logger.error(f"ChromaDB upsert timed out after {timeout}s")
@@ -158,21 +278,21 @@ class ChromaManager:
         if not file_paths:
             return 0
 
-        project_hash = hashlib.sha256(str(project_path.resolve()).encode()).hexdigest()[:12]
-
-        # Find all document IDs for these files (including all chunks)
+        # Find all document IDs for these files (including all chunks): one
+        # "$in" lookup per window of paths, returning IDs only
         all_ids = []
-        for file_path in file_paths:
-            # Search for all chunks of this file
+        for i in range(0, len(file_paths), PATH_LOOKUP_BATCH_SIZE):
+            batch = file_paths[i:i + PATH_LOOKUP_BATCH_SIZE]
             try:
-                results = collection.get(
-                    where={"relative_path": file_path},
-                    include=["metadatas"]
+                results = await asyncio.to_thread(
+                    collection.get,
+                    where={"relative_path": {"$in": batch}},
+                    include=[]
                 )
                 if results and results['ids']:
                     all_ids.extend(results['ids'])
             except Exception as e:
-                logger.warning(f"Could not find documents for {file_path}: {e}")
+                logger.warning(f"Could not find documents for {len(batch)} files: {e}")
 
         if all_ids:
             await self.delete_documents(collection, all_ids)
@@ -181,10 +301,39 @@ class ChromaManager:
 
         return 0
 
+    async def get_file_hashes(
+        self,
+        collection,
+        file_paths: List[str]
+    ) -> Dict[str, str]:
+        """
+        Get the stored content hash of indexed files.
+
+        Args:
+            collection: ChromaDB collection.
+            file_paths: List of relative file paths.
+
+        Returns:
+            Dictionary of relative path -> "hash" metadata, for files that
+            have documents with a hash.
+        """
+        hashes = {}
+        for i in range(0, len(file_paths), PATH_LOOKUP_BATCH_SIZE):
+            batch = file_paths[i:i + PATH_LOOKUP_BATCH_SIZE]
+            results = await asyncio.to_thread(
+                collection.get,
+                where={"relative_path": {"$in": batch}},
+                include=["metadatas"]
+            )
+            for metadata in results.get("metadatas") or []:
+                if metadata and metadata.get("hash"):
+                    hashes[metadata["relative_path"]] = metadata["hash"]
+        return hashes
+
     async def search(
         self,
         collection,
-        query_embedding: List[float],
+        query_embedding: Union[np.ndarray, List[float]],
         n_results: int = 5,
         metadata_filter: Optional[Dict] = None
     ) -> List[SearchResult]:
@@ -204,7 +353,7 @@ class ChromaManager:
             where = metadata_filter if metadata_filter else None
 
             results = collection.query(
-                query_embeddings=[query_embedding],
+                query_embeddings=_as_chroma_embeddings([query_embedding]),
                 n_results=n_results,
                 where=where,
                 include=["documents", "metadatas", "distances"]
@@ -254,6 +403,7 @@ class ChromaManager:
             collection_type: Type of collection ('index', 'graph', 'analysis', 'files', 'functions')
         """
         collection_name = self._get_collection_name(project_path, collection_type)
+        self._collections.pop(collection_name, None)
 
         try:
             self.client.delete_collection(name=collection_name)
@@ -302,9 +452,7 @@ class ChromaManager:
             Collection name.
         """
         # Generate stable hash from absolute path
-        normalized = str(project_path.resolve())
-        hash_digest = hashlib.sha256(normalized.encode()).hexdigest()[:12]
-        return f"project_{collection_type}_{hash_digest}"
+        return f"project_{collection_type}_{project_path_hash(str(project_path))}"
 
     def delete_all_project_collections(self, project_path: Path) -> Dict[str, bool]:
         """
@@ -355,8 +503,7 @@ class ChromaManager:
         Returns:
             Document ID string.
         """
-        project_hash = hashlib.sha256(str(project_path.resolve()).encode()).hexdigest()[:12]
-        return f"{project_hash}:{relative_path}:{chunk_index}"
+        return f"{project_path_hash(str(project_path))}:{relative_path}:{chunk_index}"
 
     def list_all_projects(self) -> List[Dict]:
         """
@@ -0,0 +1,162 @@
+"""Content-addressed on-disk cache for embedding vectors."""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "project-indexer" / "embeddings"
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed cache of embeddings keyed by (SHA-256(text), model, dimension).
+
+    Re-indexing mostly sees byte-identical chunks, so a hit here skips the
+    embedding API round-trip entirely. Switching model or dimension simply
+    misses. Vectors are stored as packed float32.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Initialize embedding cache.
+
+        Args:
+            cache_dir: Directory to store the cache database
+                (default: ~/.cache/project-indexer/embeddings)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.db_path = self.cache_dir / "embeddings.db"
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        # Lookups and writes run on worker threads; serialize access to the connection
+        self._lock = threading.Lock()
+
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_vectors (
+                sha TEXT NOT NULL,
+                model TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (sha, model, dim)
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """
+        Build the content hash for an embedded text.
+
+        Args:
+            text: Embedded text.
+
+        Returns:
+            Hex SHA-256 digest.
+        """
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, model: str, text: str, dimension: int = 0) -> Optional[np.ndarray]:
+        """
+        Look up a cached embedding.
+
+        Args:
+            model: Embedding model name.
+            text: Embedded text.
+            dimension: Embedding dimension (0 for the model default).
+
+        Returns:
+            Embedding or None on miss.
+        """
+        return self.get_many(model, [text], dimension)[0]
+
+    def get_many(
+        self,
+        model: str,
+        texts: List[str],
+        dimension: int = 0
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached embeddings for several texts.
+
+        Args:
+            model: Embedding model name.
+            texts: Embedded texts.
+            dimension: Embedding dimension (0 for the model default).
+
+        Returns:
+            Embeddings aligned with texts, None for misses.
+        """
+        keys = [self.make_key(text) for text in texts]
+        found = {}
+
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT sha, vector FROM embedding_vectors "
+                    f"WHERE model = ? AND dim = ? AND sha IN ({placeholders})",
+                    [model, dimension, *batch]
+                ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+
+        return [found.get(key) for key in keys]
+
+    def put(self, model: str, text: str, vector: Union[np.ndarray, Sequence[float]], dimension: int = 0):
+        """
+        Store an embedding.
+
+        Args:
+            model: Embedding model name.
+            text: Embedded text.
+            vector: Embedding vector.
+            dimension: Embedding dimension (0 for the model default).
+        """
+        self.put_many(model, [text], [vector], dimension)
+
+    def put_many(
+        self,
+        model: str,
+        texts: List[str],
+        vectors: List[Union[np.ndarray, Sequence[float]]],
+        dimension: int = 0
+    ):
+        """
+        Store several embeddings in one transaction.
+
+        Args:
+            model: Embedding model name.
+            texts: Embedded texts.
+            vectors: Embedding vectors aligned with texts.
+            dimension: Embedding dimension (0 for the model default).
+        """
+        rows = [
+            (self.make_key(text), model, dimension, np.asarray(vector, dtype=np.float32).tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        try:
+            with self._lock:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_vectors (sha, model, dim, vector) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self.conn.commit()
+        except sqlite3.Error as e:
+            # The cache is an optimization; never fail indexing because of it
+            logger.warning(f"Failed to write embedding cache: {e}")
+
+    def close(self):
+        """Close database connection."""
+        if self.conn:
+            self.conn.close()
@@ -1,9 +1,12 @@
 """Data models for the project indexer."""
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+
 
 # =============================================================================
 # Index 1: Project Analysis Models
@@ -150,9 +153,14 @@ class AnalyzedFunction:
 # Existing Models (Index 2 and shared)
 # =============================================================================
 
-@dataclass
+@dataclass(frozen=True)
 class ProjectContext:
-    """Context information about the entire project."""
+    """
+    Context information about the entire project.
+
+    Frozen: the context is shared by every chunk of a run, so the text
+    derived from it is built once and cached.
+    """
 
     project_name: str
     project_description: str
@@ -165,6 +173,24 @@ class ProjectContext:
     build_system: str = "unknown"
     purpose: str = ""
 
+    @cached_property
+    def tech_stack_text(self) -> str:
+        """Comma-joined tech_stack, built on first access."""
+        return ', '.join(self.tech_stack)
+
+    @cached_property
+    def frameworks_text(self) -> str:
+        """Comma-joined frameworks, built on first access."""
+        return ', '.join(self.frameworks)
+
+    @cached_property
+    def embedding_header(self) -> str:
+        """Project lines that open every chunk's embedding text."""
+        lines = [f"Project: {self.project_name}"]
+        if self.tech_stack:
+            lines.append(f"Stack: {', '.join(self.tech_stack[:5])}")
+        return "\n".join(lines)
+
 
 @dataclass
 class FileMetadata:
@@ -176,7 +202,7 @@ class FileMetadata:
     last_modified: float
     language: str
     file_type: str  # code|documentation|config|test
-    hash: str  # SHA256 hash of content
+    hash: str  # Content hash (see utils.content_hash)
 
 
 @dataclass
@@ -202,13 +228,23 @@ class CodeAnalysis:
 
 @dataclass
 class CodeChunk:
-    """A chunk of code from a larger file."""
+    """
+    A chunk of code from a larger file.
+
+    Chunks share the file's line list and slice their content from it on
+    first access, so chunking doesn't copy the file once per chunk up front.
+    """
 
-    content: str
     chunk_index: int
     total_chunks: int
-    start_line: int = 0
-    end_line: int = 0
+    start_line: int = 0  # 1-based, inclusive
+    end_line: int = 0  # 1-based, inclusive
+    source_lines: List[str] = field(default_factory=list, repr=False, compare=False)
+
+    @cached_property
+    def content(self) -> str:
+        """Chunk text, joined from source_lines on first access."""
+        return ''.join(self.source_lines[self.start_line - 1:self.end_line])
 
 
 @dataclass
@@ -217,10 +253,61 @@ class IndexedDocument:
 
     id: str  # Format: {project_hash}:{relative_path}:{chunk_index}
     content: str  # Code or content
-    embedding: Optional[List[float]]  # Will be generated
+    embedding: Optional[np.ndarray]  # float32 vector; None until generated
     metadata: Dict[str, any]
 
 
+@dataclass
+class DocumentBatch:
+    """
+    Documents in column form, the layout ChromaDB's upsert takes.
+
+    Building the parallel lists directly skips one IndexedDocument per
+    chunk and the row-to-column pass before every upsert.
+    """
+
+    ids: List[str] = field(default_factory=list)
+    contents: List[str] = field(default_factory=list)
+    embeddings: List[np.ndarray] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, doc_id: str, content: str, embedding: np.ndarray, metadata: Dict[str, Any]):
+        """Add one document."""
+        self.ids.append(doc_id)
+        self.contents.append(content)
+        self.embeddings.append(embedding)
+        self.metadatas.append(metadata)
+
+    def extend(self, other: "DocumentBatch"):
+        """Add all documents of another batch."""
+        self.ids.extend(other.ids)
+        self.contents.extend(other.contents)
+        self.embeddings.extend(other.embeddings)
+        self.metadatas.extend(other.metadatas)
+
+    def slice(self, start: int, stop: int) -> "DocumentBatch":
+        """Get documents [start, stop) as a new batch."""
+        return DocumentBatch(
+            self.ids[start:stop],
+            self.contents[start:stop],
+            self.embeddings[start:stop],
+            self.metadatas[start:stop]
+        )
+
+    @classmethod
+    def from_documents(cls, documents: List["IndexedDocument"]) -> "DocumentBatch":
+        """Build a batch from IndexedDocument objects."""
+        return cls(
+            [doc.id for doc in documents],
+            [doc.content for doc in documents],
+            [doc.embedding for doc in documents],
+            [doc.metadata for doc in documents]
+        )
+
+
 @dataclass
 class SearchResult:
     """Result from semantic search."""
@@ -0,0 +1,125 @@
+"""On-disk cache for LLM responses keyed by exact prompt."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "project-indexer" / "responses"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of LLM completions keyed by SHA-256 of the prompt.
+
+    Reindexing sends byte-identical prompts for unchanged code; a hit returns
+    the stored completion without an LLM round-trip. Entries expire after ttl.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """
+        Initialize response cache.
+
+        Args:
+            cache_dir: Directory to store the cache database
+                (default: ~/.cache/project-indexer/responses)
+            ttl_seconds: Entry lifetime in seconds (default: 7 days)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+
+        self.db_path = self.cache_dir / "responses.db"
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        # Lookups and writes run on worker threads; serialize access to the connection
+        self._lock = threading.Lock()
+
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                sha TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model: str, parts: List[str]) -> str:
+        """
+        Build the cache key for a prompt.
+
+        Args:
+            model: LLM model name
+            parts: Prompt parts in order (e.g. system and user message contents)
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        digest = hashlib.sha256(model.encode())
+        for part in parts:
+            digest.update(b"\0")
+            digest.update(part.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Cached response text or None on miss/expiry
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response FROM llm_responses WHERE sha = ? AND created_at >= ?",
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, response: str):
+        """
+        Store a response.
+
+        Args:
+            key: Key from make_key
+            response: Response text
+        """
+        try:
+            with self._lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (sha, response, created_at) VALUES (?, ?, ?)",
+                    (key, response, time.time())
+                )
+                self.conn.commit()
+        except sqlite3.Error as e:
+            # The cache is an optimization; never fail analysis because of it
+            logger.warning(f"Failed to write response cache: {e}")
+
+    def prune(self) -> int:
+        """
+        Delete expired entries.
+
+        Returns:
+            Number of entries deleted
+        """
+        with self._lock:
+            cursor = self.conn.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,)
+            )
+            self.conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        """Close database connection."""
+        if self.conn:
+            self.conn.close()
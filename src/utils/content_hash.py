@@ -0,0 +1,50 @@
+"""Fast content hashing for change detection.
+
+Uses xxh3-64 when xxhash is installed, SHA-256 otherwise. The digests are
+only compared against earlier digests of the same file, never used for
+security, so a non-cryptographic hash is enough. Switching backends
+simply makes stored hashes mismatch once and the files get reindexed.
+"""
+
+import hashlib
+from typing import BinaryIO
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+def _new_hasher():
+    """Create a hasher for the available backend."""
+    if xxhash is not None:
+        return xxhash.xxh3_64()
+    return hashlib.sha256()
+
+
+def content_hash(data: bytes) -> str:
+    """
+    Hash file content.
+
+    Args:
+        data: Content bytes
+
+    Returns:
+        Hex digest
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(data)
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_content_hash(fileobj: BinaryIO) -> str:
+    """
+    Hash a binary file object by streaming it.
+
+    Args:
+        fileobj: File opened in binary mode
+
+    Returns:
+        Hex digest (same value content_hash gives for the file's bytes)
+    """
+    return hashlib.file_digest(fileobj, _new_hasher).hexdigest()
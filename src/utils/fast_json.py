@@ -0,0 +1,31 @@
+"""JSON parsing that uses orjson when it is installed.
+
+orjson is an optional dependency: it parses LLM responses several times
+faster than the stdlib, but everything works without it.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        data: JSON text (str or bytes)
+
+    Returns:
+        Parsed value
+
+    Raises:
+        ValueError: If data is not valid JSON (both backends raise a subclass)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -48,6 +48,11 @@ class RateLimiter:
             tokens: Number of tokens (for TPM limit).
             request_count: Number of requests (for RPM limit).
         """
+        # A batched request may ask for more than a full bucket; cap it at
+        # capacity so it waits for a full bucket instead of forever
+        tokens = min(tokens, self.tpm)
+        request_count = min(request_count, self.rpm)
+
         while True:
             async with self.lock:
                 # Refill buckets based on elapsed time
@@ -82,7 +87,7 @@ class RateLimiter:
                 wait_time = max(wait_time_requests, wait_time_tokens, 0.1)
 
             # Sleep OUTSIDE the lock to avoid blocking other coroutines!
-            logger.debug(f"Rate limit reached, waiting {wait_time:.2f}s")
+            logger.debug("Rate limit reached, waiting %.2fs", wait_time)
             await asyncio.sleep(wait_time)
 
     async def execute_with_retry(
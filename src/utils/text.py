@@ -0,0 +1,36 @@
+"""Decoding of file content read as bytes.
+
+Files are read with read_bytes() to skip the TextIOWrapper layer, which
+also skips its universal-newlines translation; these helpers restore it.
+"""
+
+
+def normalize_newlines(data: bytes) -> bytes:
+    """
+    Convert CRLF and lone CR line endings to LF.
+
+    Works on UTF-8 bytes directly (0x0D never occurs inside a multi-byte
+    sequence), so byte offsets into the result match the decoded text.
+
+    Args:
+        data: Raw file content
+
+    Returns:
+        Content with LF line endings (data itself if it has no CR)
+    """
+    if b'\r' not in data:
+        return data
+    return data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+
+def decode_text(data: bytes) -> str:
+    """
+    Decode file content the way read_text(encoding='utf-8', errors='ignore') does.
+
+    Args:
+        data: Raw file content
+
+    Returns:
+        Text with invalid UTF-8 dropped and newlines normalized to LF
+    """
+    return normalize_newlines(data).decode('utf-8', errors='ignore')
@@ -1,5 +1,7 @@
 """HTTP сервер для административной панели."""
 
+from collections import Counter
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -12,6 +14,8 @@ from ..config import load_config
 from ..storage.chroma_client import ChromaManager
 from ..storage.checkpoint_manager import CheckpointManager
 from ..storage.analysis_repository import AnalysisRepository
+from ..storage.embedding_cache import EmbeddingCache
+from ..storage.response_cache import ResponseCache
 from ..indexer.iterative_analyzer import IterativeProjectAnalyzer
 from ..indexer.file_index_manager import FileIndexManager
 from ..indexer.function_index_manager import FunctionIndexManager
@@ -86,7 +90,9 @@ async def startup():
     # Initialize file index manager (Index 2)
     file_index_manager = FileIndexManager(
         config, chroma, llm_provider, embedding_provider,
-        rate_limiter, checkpoint_manager, analysis_repo
+        rate_limiter, checkpoint_manager, analysis_repo,
+        embedding_cache=EmbeddingCache(),
+        response_cache=ResponseCache()
     )
 
     # Initialize function index manager (Index 3)
@@ -104,25 +110,26 @@ async def startup():
 
 def _get_unique_projects() -> List[str]:
     """Get unique project paths from checkpoint database."""
-    cursor = checkpoint_manager.conn.cursor()
+    with checkpoint_manager.lock:
+        cursor = checkpoint_manager.conn.cursor()
 
-    # Get all unique project paths from all three index tables
-    project_paths = set()
+        # Get all unique project paths from all three index tables
+        project_paths = set()
 
-    # From project_analysis
-    cursor.execute("SELECT DISTINCT project_path FROM project_analysis")
-    for row in cursor.fetchall():
-        project_paths.add(row[0])
+        # From project_analysis
+        cursor.execute("SELECT DISTINCT project_path FROM project_analysis")
+        for row in cursor.fetchall():
+            project_paths.add(row[0])
 
-    # From file_index_checkpoints
-    cursor.execute("SELECT DISTINCT project_path FROM file_index_checkpoints")
-    for row in cursor.fetchall():
-        project_paths.add(row[0])
+        # From file_index_checkpoints
+        cursor.execute("SELECT DISTINCT project_path FROM file_index_checkpoints")
+        for row in cursor.fetchall():
+            project_paths.add(row[0])
 
-    # From function_index_checkpoints
-    cursor.execute("SELECT DISTINCT project_path FROM function_index_checkpoints")
-    for row in cursor.fetchall():
-        project_paths.add(row[0])
+        # From function_index_checkpoints
+        cursor.execute("SELECT DISTINCT project_path FROM function_index_checkpoints")
+        for row in cursor.fetchall():
+            project_paths.add(row[0])
 
     return list(project_paths)
 
@@ -167,17 +174,18 @@ def _build_project_data(project_str: str) -> dict:
     # Get indexed_at timestamp (use most recent)
     indexed_at = None
     try:
-        cursor = checkpoint_manager.conn.cursor()
-        cursor.execute("""
-            SELECT MAX(created_at) FROM (
-                SELECT created_at FROM project_analysis WHERE project_path = ?
-                UNION ALL
-                SELECT created_at FROM file_index_checkpoints WHERE project_path = ?
-                UNION ALL
-                SELECT created_at FROM function_index_checkpoints WHERE project_path = ?
-            )
-        """, (project_str, project_str, project_str))
-        row = cursor.fetchone()
+        with checkpoint_manager.lock:
+            cursor = checkpoint_manager.conn.cursor()
+            cursor.execute("""
+                SELECT MAX(created_at) FROM (
+                    SELECT created_at FROM project_analysis WHERE project_path = ?
+                    UNION ALL
+                    SELECT created_at FROM file_index_checkpoints WHERE project_path = ?
+                    UNION ALL
+                    SELECT created_at FROM function_index_checkpoints WHERE project_path = ?
+                )
+            """, (project_str, project_str, project_str))
+            row = cursor.fetchone()
         if row and row[0]:
             # Convert timestamp string to unix timestamp
             from datetime import datetime
@@ -627,23 +635,24 @@ async def get_analysis_iterations(project_path: str):
     try:
         path = Path(project_path).resolve()
 
-        cursor = checkpoint_manager.conn.cursor()
-        cursor.execute("""
-            SELECT iteration, files_requested, files_read, snapshot, created_at
-            FROM analysis_iterations
-            WHERE project_path = ?
-            ORDER BY iteration ASC
-        """, (str(path),))
-
-        iterations = []
-        for row in cursor.fetchall():
-            import json
-            iterations.append({
-                "iteration": row[0],
-                "files_requested": json.loads(row[1]) if row[1] else [],
-                "files_read": json.loads(row[2]) if row[2] else [],
-                "created_at": row[4]
-            })
+        with checkpoint_manager.lock:
+            cursor = checkpoint_manager.conn.cursor()
+            cursor.execute("""
+                SELECT iteration, files_requested, files_read, snapshot, created_at
+                FROM analysis_iterations
+                WHERE project_path = ?
+                ORDER BY iteration ASC
+            """, (str(path),))
+
+            iterations = []
+            for row in cursor.fetchall():
+                import json
+                iterations.append({
+                    "iteration": row[0],
+                    "files_requested": json.loads(row[1]) if row[1] else [],
+                    "files_read": json.loads(row[2]) if row[2] else [],
+                    "created_at": row[4]
+                })
 
         return {
             "status": "success",
@@ -1050,16 +1059,8 @@ async def get_call_graph_stats(project_path: str):
 
         # Calculate stats
         entry_points = [f for f in functions if f.get('is_entry_point')]
-        layers = {}
-        trigger_types = {}
-
-        for func in functions:
-            layer = func.get('layer', 'unknown')
-            layers[layer] = layers.get(layer, 0) + 1
-
-            if func.get('trigger_type'):
-                trigger = func['trigger_type']
-                trigger_types[trigger] = trigger_types.get(trigger, 0) + 1
+        layers = dict(Counter(f.get('layer', 'unknown') for f in functions))
+        trigger_types = dict(Counter(f['trigger_type'] for f in functions if f.get('trigger_type')))
 
         # Get total calls
         calls = graph_store.get_all_calls(str(path))
@@ -1490,22 +1491,23 @@ if static_dir.exists():
     async def get_file_checkpoints(project_path: str):
         """Get all file index checkpoints for a project."""
         try:
-            cursor = checkpoint_manager.conn.cursor()
-            cursor.execute("""
-                SELECT relative_path, status, chunks_count, created_at
-                FROM file_index_checkpoints
-                WHERE project_path = ?
-                ORDER BY created_at DESC
-            """, (project_path,))
-
-            checkpoints = []
-            for row in cursor.fetchall():
-                checkpoints.append({
-                    "relative_path": row[0],
-                    "status": row[1],
-                    "chunks_count": row[2],
-                    "created_at": row[3]
-                })
+            with checkpoint_manager.lock:
+                cursor = checkpoint_manager.conn.cursor()
+                cursor.execute("""
+                    SELECT relative_path, status, chunks_count, created_at
+                    FROM file_index_checkpoints
+                    WHERE project_path = ?
+                    ORDER BY created_at DESC
+                """, (project_path,))
+
+                checkpoints = []
+                for row in cursor.fetchall():
+                    checkpoints.append({
+                        "relative_path": row[0],
+                        "status": row[1],
+                        "chunks_count": row[2],
+                        "created_at": row[3]
+                    })
 
             return {"checkpoints": checkpoints}
         except Exception as e:
@@ -1516,22 +1518,23 @@ if static_dir.exists():
     async def get_function_checkpoints(project_path: str):
         """Get all function index checkpoints for a project."""
         try:
-            cursor = checkpoint_manager.conn.cursor()
-            cursor.execute("""
-                SELECT relative_path, status, functions_count, created_at
-                FROM function_index_checkpoints
-                WHERE project_path = ?
-                ORDER BY created_at DESC
-            """, (project_path,))
-
-            checkpoints = []
-            for row in cursor.fetchall():
-                checkpoints.append({
-                    "relative_path": row[0],
-                    "status": row[1],
-                    "functions_count": row[2],
-                    "created_at": row[3]
-                })
+            with checkpoint_manager.lock:
+                cursor = checkpoint_manager.conn.cursor()
+                cursor.execute("""
+                    SELECT relative_path, status, functions_count, created_at
+                    FROM function_index_checkpoints
+                    WHERE project_path = ?
+                    ORDER BY created_at DESC
+                """, (project_path,))
+
+                checkpoints = []
+                for row in cursor.fetchall():
+                    checkpoints.append({
+                        "relative_path": row[0],
+                        "status": row[1],
+                        "functions_count": row[2],
+                        "created_at": row[3]
+                    })
 
             return {"checkpoints": checkpoints}
         except Exception as e:
@@ -0,0 +1,93 @@
+"""Tests for ChromaManager collection handle caching."""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from src.storage.chroma_client import ChromaManager  # noqa: E402
+
+
+class FakeCollection:
+    def __init__(self, name, documents=0):
+        self.name = name
+        self.deleted = False
+        self.documents = documents
+
+    def count(self):
+        if self.deleted:
+            raise ValueError(f"Collection {self.name} does not exist.")
+        return self.documents
+
+
+class FakeClient:
+    """In-memory stand-in for a ChromaDB client shared by two processes."""
+
+    def __init__(self):
+        self.collections = {}
+        self.fetches = 0
+
+    def get_collection(self, name):
+        self.fetches += 1
+        if name not in self.collections:
+            raise ValueError(f"Collection {name} does not exist.")
+        return self.collections[name]
+
+    def create_collection(self, name, metadata=None):
+        self.collections[name] = FakeCollection(name)
+        return self.collections[name]
+
+    def get_or_create_collection(self, name, metadata=None):
+        self.fetches += 1
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(name)
+        return self.collections[name]
+
+    def delete_collection(self, name):
+        self.collections.pop(name).deleted = True
+
+
+def _manager(client):
+    manager = ChromaManager.__new__(ChromaManager)
+    manager._collections = {}
+    manager.client = client
+    return manager
+
+
+def test_collection_handle_is_cached():
+    client = FakeClient()
+    manager = _manager(client)
+
+    first = manager.get_or_create_collection(Path("/proj"), collection_type='files')
+    second = manager.get_or_create_collection(Path("/proj"), collection_type='files')
+
+    assert first is second
+    assert client.fetches == 1
+
+
+def test_stale_handle_refetches_recreated_collection():
+    """A collection recreated by another process is picked up on next use."""
+    client = FakeClient()
+    manager = _manager(client)
+    collection = manager.get_or_create_collection(Path("/proj"), collection_type='files')
+    name = manager._get_collection_name(Path("/proj"), 'files')
+
+    # Another process deletes and recreates the collection
+    client.delete_collection(name)
+    client.collections[name] = FakeCollection(name, documents=7)
+
+    assert collection.count() == 7
+    assert manager.get_or_create_collection(Path("/proj"), collection_type='files').count() == 7
+
+
+def test_other_errors_are_not_retried():
+    client = FakeClient()
+    manager = _manager(client)
+    collection = manager.get_or_create_collection(Path("/proj"), collection_type='files')
+    fetches = client.fetches
+
+    with pytest.raises(TypeError):
+        collection.count(1)
+
+    assert client.fetches == fetches
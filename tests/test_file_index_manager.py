@@ -0,0 +1,104 @@
+"""Tests for FileIndexManager.index_files batching."""
+
+import asyncio
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("openai")
+
+from src.config import IndexingConfig  # noqa: E402
+from src.indexer import file_index_manager as fim  # noqa: E402
+from src.storage.checkpoint_manager import CheckpointManager  # noqa: E402
+from src.storage.models import DocumentBatch  # noqa: E402
+
+CHUNKS_PER_FILE = 300
+FILE_COUNT = 10
+
+
+class FakeChroma:
+    """Records every stored batch instead of writing to ChromaDB."""
+
+    def __init__(self):
+        self.stored = []
+
+    def get_or_create_collection(self, project_path, collection_type='index'):
+        return "collection"
+
+    def delete_collection(self, project_path, collection_type='index'):
+        pass
+
+    def _get_collection_name(self, project_path, collection_type='index'):
+        return f"project_{collection_type}_test"
+
+    async def add_document_batch(self, collection, documents):
+        self.stored.append(len(documents))
+
+
+class FakeAnalysisRepository:
+    def get_analysis(self, project_str):
+        return types.SimpleNamespace(
+            completed=True,
+            min_confidence=lambda: 100,
+            to_project_context=lambda: None
+        )
+
+
+def _file_meta(project_path: Path, i: int):
+    return types.SimpleNamespace(
+        relative_path=Path(f"f{i}.py"),
+        file_path=project_path / f"f{i}.py",
+        hash=f"h{i}",
+        file_size=1,
+        last_modified=1.0,
+        file_type="code",
+        language="python"
+    )
+
+
+def test_index_files_flushes_more_than_flush_size(tmp_path, monkeypatch):
+    """Runs past DOCUMENT_FLUSH_SIZE store every chunk exactly once."""
+    assert CHUNKS_PER_FILE * FILE_COUNT > fim.DOCUMENT_FLUSH_SIZE
+
+    files = [_file_meta(tmp_path, i) for i in range(FILE_COUNT)]
+
+    async def fake_scan(*args, **kwargs):
+        return files
+
+    monkeypatch.setattr(fim, "scan_project", fake_scan)
+
+    chroma = FakeChroma()
+    manager = fim.FileIndexManager(
+        config=types.SimpleNamespace(
+            indexing=IndexingConfig(max_concurrent_files=4),
+            patterns=types.SimpleNamespace(include=["**/*.py"], exclude=[])
+        ),
+        chroma=chroma,
+        llm_provider=None,
+        embedding_provider=None,
+        rate_limiter=None,
+        checkpoint_manager=CheckpointManager(tmp_path / "checkpoints"),
+        analysis_repository=FakeAnalysisRepository()
+    )
+
+    async def store_context(*args):
+        pass
+
+    async def process_file(file_meta, project_path, project_context):
+        docs = DocumentBatch()
+        for j in range(CHUNKS_PER_FILE):
+            docs.append(f"{file_meta.hash}-{j}", "", np.zeros(3, dtype=np.float32), {})
+        return docs
+
+    monkeypatch.setattr(manager, "_store_project_context", store_context)
+    monkeypatch.setattr(manager, "_process_file", process_file)
+
+    result = asyncio.run(manager.index_files(tmp_path))
+
+    assert result["status"] == "success"
+    assert result["stats"]["indexed_files"] == FILE_COUNT
+    assert len(chroma.stored) > 1
+    assert sum(chroma.stored) == CHUNKS_PER_FILE * FILE_COUNT